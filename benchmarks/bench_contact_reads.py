@@ -0,0 +1,88 @@
+import asyncio
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import CONTACT_COLUMNS
+from src.services.serialization import dump_contacts
+
+
+"""Compare reading contacts as ORM entities with the Core column path, with and without a projection.
+
+Run from the project root: python -m benchmarks.bench_contact_reads
+"""
+
+SIZES = (1_000, 10_000, 50_000)
+FIELDS = ("id", "name", "email")
+
+
+async def seed(session: AsyncSession, count: int) -> int:
+    user_id = (await session.execute(
+        insert(User).values(username=f"bench{count}", email=f"bench{count}@example.com", hashed_password="x")
+        .returning(User.id)
+    )).scalar_one()
+    await session.execute(insert(Contact), [
+        Contact.with_derived_values(dict(
+            user_id=user_id, name=f"Name{i}", last_name=f"Last{i}", email=f"contact{i}@example.com",
+            phone="1234567890", birthday=date(1990, 1 + i % 12, 1 + i % 28), additional_info="Met at the conference",
+            created_at=datetime(2025, 6, 1, 12, 0, 0),
+        ))
+        for i in range(count)
+    ])
+    await session.commit()
+    return user_id
+
+
+async def entities(session: AsyncSession, user_id: int) -> bytes:
+    contacts = (await session.execute(select(Contact).where(Contact.user_id == user_id))).scalars().all()
+    return dump_contacts(contacts)
+
+
+async def rows(session: AsyncSession, user_id: int) -> bytes:
+    result = await session.execute(select(*CONTACT_COLUMNS.values()).where(Contact.user_id == user_id))
+    return dump_contacts(result.all())
+
+
+async def projected(session: AsyncSession, user_id: int) -> bytes:
+    columns = [CONTACT_COLUMNS[name] for name in FIELDS]
+    result = await session.execute(select(*columns).where(Contact.user_id == user_id))
+    return dump_contacts(result.all(), FIELDS)
+
+
+async def timed(read, engine, user_id: int) -> float:
+    async with AsyncSession(engine) as session:
+        started = time.perf_counter()
+        await read(session, user_id)
+        return time.perf_counter() - started
+
+
+async def bench(label: str, read, engine, user_id: int, count: int):
+    """Report the best of three untraced runs and the peak memory of one traced run."""
+    elapsed = min([await timed(read, engine, user_id) for _ in range(3)])
+    tracemalloc.start()
+    await timed(read, engine, user_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {count:>7} {elapsed * 1e6 / count:>10.2f} us/row {peak / count:>10.0f} B/row peak")
+
+
+async def main():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    print(f"{'path':<22} {'rows':>7} {'time':>17} {'memory':>20}")
+    for count in SIZES:
+        async with AsyncSession(engine) as session:
+            user_id = await seed(session, count)
+        await bench("ORM entities", entities, engine, user_id, count)
+        await bench("Core rows", rows, engine, user_id, count)
+        await bench(f"Core rows, {len(FIELDS)} fields", projected, engine, user_id, count)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import json
+import timeit
+from datetime import date, datetime
+from typing import List
+
+from pydantic import TypeAdapter
+
+from src.database.models import Contact
+from src.schemas import ContactResponse
+from src.services.serialization import dump_contacts
+
+
+"""Compare ways of turning contacts loaded from the database into a JSON list response.
+
+Run from the project root: python -m benchmarks.bench_contact_serialization
+"""
+
+SIZES = (10, 1_000, 10_000)
+CONTACT_LIST = TypeAdapter(List[ContactResponse])
+
+
+def make_contacts(count: int) -> list[Contact]:
+    return [
+        Contact(
+            id=i,
+            name=f"Name{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone="1234567890",
+            birthday=date(1990, 1 + i % 12, 1 + i % 28),
+            additional_info="Met at the conference" if i % 3 else None,
+            created_at=datetime(2025, 6, 1, 12, 0, 0, 123456),
+            updated_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def per_row_and_response_model(contacts) -> bytes:
+    """The previous path: model_validate per row, then FastAPI validates and encodes for response_model."""
+    models = [ContactResponse.model_validate(contact) for contact in contacts]
+    content = CONTACT_LIST.dump_python(CONTACT_LIST.validate_python(models), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def type_adapter(contacts) -> bytes:
+    return CONTACT_LIST.dump_json(CONTACT_LIST.validate_python(contacts, from_attributes=True))
+
+
+def bench(label: str, encode, contacts) -> float:
+    number = max(1, 20_000 // len(contacts))
+    per_row_us = timeit.timeit(lambda: encode(contacts), number=number) / number / len(contacts) * 1e6
+    print(f"{label:<26} {len(contacts):>7} {per_row_us:>12.2f} us/row")
+    return per_row_us
+
+
+def main():
+    print(f"{'path':<26} {'rows':>7} {'cost':>19}")
+    for size in SIZES:
+        contacts = make_contacts(size)
+        assert dump_contacts(contacts) == type_adapter(contacts)
+        bench("per-row + response_model", per_row_and_response_model, contacts)
+        bench("TypeAdapter one pass", type_adapter, contacts)
+        bench("orjson row mapping", dump_contacts, contacts)
+
+
+if __name__ == "__main__":
+    main()
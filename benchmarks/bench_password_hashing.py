@@ -0,0 +1,48 @@
+import time
+
+from passlib.hash import argon2
+
+from src.services.hashing import build_crypt_context
+
+
+"""Report login throughput per core for each password hashing cost setting.
+
+A login costs one verify, so logins/s per core is 1 / verify time.
+Run from the project root: python -m benchmarks.bench_password_hashing
+"""
+
+PASSWORD = "benchmark-password"
+SAMPLES = 5
+
+
+def verify_ms(context) -> float:
+    hashed = context.hash(PASSWORD)
+    timings = []
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        context.verify(PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def report(label: str, context):
+    elapsed = verify_ms(context)
+    print(f"{label:<28} {elapsed:>10.1f} ms {1000 / elapsed:>12.1f}")
+
+
+def main():
+    print(f"{'setting':<28} {'verify':>13} {'logins/s/core':>12}")
+    for rounds in range(10, 15):
+        report(f"bcrypt rounds={rounds}", build_crypt_context("bcrypt", bcrypt_rounds=rounds))
+    if argon2.has_backend():
+        for time_cost in (1, 2, 3, 4):
+            report(
+                f"argon2 t={time_cost} m=64MiB p=2",
+                build_crypt_context("argon2", argon2_time_cost=time_cost),
+            )
+    else:
+        print("argon2-cffi is not installed, skipping argon2 settings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import time
+import timeit
+from datetime import date
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import CONTACT_COLUMNS, ContactRepository
+from src.repository.users import USER_BY_USERNAME
+
+
+"""Measure the Python overhead of building hot statements per call versus reusing cached ones.
+
+Statement construction and cache key generation are timed on their own, then whole queries
+against in-memory SQLite, where the database itself costs little.
+
+Run from the project root: python -m benchmarks.bench_statement_cache
+"""
+
+NUMBER = 5_000
+
+
+def build_user_lookup():
+    return select(User).where(User.username == "benchmark_user")
+
+
+def build_contact_page():
+    keys = (Contact.last_name, Contact.name, Contact.id)
+    return (
+        select(*CONTACT_COLUMNS.values())
+        .where(Contact.user_id == 1, Contact.last_name == "Last1")
+        .order_by(*keys)
+        .offset(0)
+        .limit(11)
+    )
+
+
+PAGE_PARAMS = {"user_id": 1, "filter_last_name": "Last1", "offset": 0, "limit": 11}
+
+
+def cached_contact_page():
+    return ContactRepository._list_statement("last_name", None, tuple(sorted(PAGE_PARAMS)), False)
+
+
+def bench_build(label: str, build):
+    per_call_us = timeit.timeit(lambda: build()._generate_cache_key(), number=NUMBER) / NUMBER * 1e6
+    print(f"{label:<34} {per_call_us:>9.2f} us/statement")
+
+
+async def bench_query(label: str, session: AsyncSession, run):
+    await run(session)
+    started = time.perf_counter()
+    for _ in range(NUMBER):
+        await run(session)
+    print(f"{label:<34} {(time.perf_counter() - started) / NUMBER * 1e6:>9.2f} us/query")
+
+
+async def main():
+    print("construction and cache key")
+    bench_build("user by username, built", build_user_lookup)
+    bench_build("user by username, cached", lambda: USER_BY_USERNAME)
+    bench_build("contact page, built", build_contact_page)
+    bench_build("contact page, cached", cached_contact_page)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        await session.execute(insert(User).values(id=1, username="benchmark_user", email="b@example.com",
+                                                  hashed_password="x"))
+        await session.execute(insert(Contact), [
+            Contact.with_derived_values(dict(user_id=1, name=f"Name{i}", last_name=f"Last{i % 10}",
+                                             email=f"c{i}@example.com", phone="1234567890",
+                                             birthday=date(1990, 1, 1)))
+            for i in range(100)
+        ])
+        await session.commit()
+
+        print("whole query")
+        await bench_query("user by username, built", session,
+                          lambda s: s.execute(build_user_lookup()))
+        await bench_query("user by username, cached", session,
+                          lambda s: s.execute(USER_BY_USERNAME, {"username": "benchmark_user"}))
+        await bench_query("contact page, built", session,
+                          lambda s: s.execute(build_contact_page()))
+        await bench_query("contact page, cached", session,
+                          lambda s: s.execute(cached_contact_page(), PAGE_PARAMS))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
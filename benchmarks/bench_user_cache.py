@@ -0,0 +1,51 @@
+import pickle
+import timeit
+from datetime import datetime
+
+from src.database.models import User
+from src.schemas import CachedUser
+
+
+"""Compare the legacy pickled ORM user cache payload with the versioned CachedUser JSON.
+
+Run from the project root: python -m benchmarks.bench_user_cache
+"""
+
+NUMBER = 20_000
+
+
+def make_user() -> User:
+    return User(
+        id=42,
+        username="benchmark_user",
+        email="benchmark_user@example.com",
+        is_verified=True,
+        is_admin=False,
+        token_version=0,
+        hashed_password="$2b$12$" + "x" * 53,
+        avatar="https://www.gravatar.com/avatar/0123456789abcdef0123456789abcdef",
+        created_at=datetime(2025, 6, 1, 12, 0, 0),
+    )
+
+
+def bench(label: str, encode, decode, user):
+    payload = encode(user)
+    encode_us = timeit.timeit(lambda: encode(user), number=NUMBER) / NUMBER * 1e6
+    decode_us = timeit.timeit(lambda: decode(payload), number=NUMBER) / NUMBER * 1e6
+    print(f"{label:<14} {len(payload):>8} B {encode_us:>10.2f} us {decode_us:>10.2f} us")
+
+
+def main():
+    user = make_user()
+    print(f"{'format':<14} {'size':>10} {'encode':>13} {'decode':>13}")
+    bench("pickle ORM", pickle.dumps, pickle.loads, user)
+    bench(
+        "CachedUser v1",
+        lambda u: CachedUser.model_validate(u).model_dump_json().encode(),
+        CachedUser.model_validate_json,
+        user,
+    )
+
+
+if __name__ == "__main__":
+    main()
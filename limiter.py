@@ -1,4 +1 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from src.services.rate_limit import RateLimitExceeded, limiter
@@ -1,23 +1,53 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.status import HTTP_400_BAD_REQUEST
-from slowapi.middleware import SlowAPIMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi.errors import RateLimitExceeded
 
 
-from src.api import utils, contacts, auth, users
+from src.api import utils, contacts, auth, users, admin
 from src.database.db import sessionmanager
 from src.database.models import Base
-from limiter import limiter
+from src.database.redis import redis_manager
+from src.services.auth import Hash
+from src.services.cache import user_cache
+from src.services.hashing import hash_pool
+from src.conf.config import config
+from limiter import RateLimitExceeded, limiter
 
 
 """Main application entry point for the FastAPI application."""
 
-app = FastAPI()
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+
+async def create_tables():
+    """Create database tables on application startup."""
+    async with sessionmanager._engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare shared resources on startup and release them on shutdown."""
+    """Creates database tables, warms the database pools, and starts the replica health checks,
+    the pooled Redis client and the user cache invalidation listener."""
+    await create_tables()
+    if config.DB_POOL_WARM_UP:
+        await sessionmanager.warm_up()
+    sessionmanager.start()
+    if config.PASSWORD_HASH_CALIBRATE:
+        await Hash.calibrate()
+    redis_manager.connect()
+    user_cache.start()
+    yield
+    await user_cache.stop()
+    await redis_manager.close()
+    hash_pool.shutdown()
+    await sessionmanager.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 origins = ["<http://localhost:8000>"]
 
 app.add_middleware(
@@ -35,6 +65,7 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
         status_code=429,
         content={"error": "Too many requests."},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
     )
 
 
@@ -47,17 +78,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-@app.on_event("startup")
-async def create_tables():
-    """Create database tables on application startup."""
-    async with sessionmanager._engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-
 app.include_router(utils.router, prefix="/api")
-app.include_router(auth.router, prefix="/api")
-app.include_router(users.router, prefix="/api")
-app.include_router(contacts.router, prefix="/api")
+app.include_router(auth.router, prefix="/api",
+                   dependencies=[Depends(limiter.limit("auth"))])
+app.include_router(users.router, prefix="/api",
+                   dependencies=[Depends(limiter.limit("users"))])
+app.include_router(contacts.router, prefix="/api",
+                   dependencies=[Depends(limiter.limit("contacts"))])
+app.include_router(admin.router, prefix="/api",
+                   dependencies=[Depends(limiter.limit("default"))])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""Add per-user contact indexes and per-user email uniqueness
+
+Revision ID: 5d7b2e9c1a38
+Revises: 8c2e5d0a4f17
+Create Date: 2026-10-18 14:21:47.108352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7b2e9c1a38'
+down_revision: Union[str, None] = '8c2e5d0a4f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+"""On PostgreSQL the indexes are built CONCURRENTLY outside the migration transaction, so the
+contacts table stays writable while they build. The per-user unique index is in place before
+the global email constraint is dropped, so emails are never left unchecked. Elsewhere the
+constraint is dropped in batch mode; SQLite leaves it unnamed, so the naming convention gives
+it the name PostgreSQL uses."""
+
+NAMING_CONVENTION = {'uq': '%(table_name)s_%(column_0_name)s_key'}
+
+INDEXES = [
+    ('ix_contacts_user_id_id', ['user_id', 'id'], False),
+    ('ix_contacts_user_id_last_name_name', ['user_id', 'last_name', 'name'], False),
+    ('uq_contacts_user_id_email', ['user_id', 'email'], True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns, unique in INDEXES:
+                if _is_invalid(name):
+                    op.drop_index(name, table_name='contacts', postgresql_concurrently=True)
+                op.create_index(name, 'contacts', columns, unique=unique,
+                                postgresql_concurrently=True, if_not_exists=True)
+        op.drop_constraint('contacts_email_key', 'contacts', type_='unique')
+        return
+
+    for name, columns, unique in INDEXES:
+        op.create_index(name, 'contacts', columns, unique=unique)
+    with op.batch_alter_table('contacts', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('contacts_email_key', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'postgresql':
+        op.create_unique_constraint('contacts_email_key', 'contacts', ['email'])
+        with op.get_context().autocommit_block():
+            for name, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name='contacts',
+                              postgresql_concurrently=True, if_exists=True)
+        return
+
+    with op.batch_alter_table('contacts', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.create_unique_constraint('contacts_email_key', ['email'])
+    for name, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='contacts')
+
+
+def _is_invalid(name: str) -> bool:
+    """Tell whether a previous interrupted CONCURRENTLY build left an invalid index behind."""
+    if op.get_context().as_sql:
+        return False
+    return bool(op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).scalar())
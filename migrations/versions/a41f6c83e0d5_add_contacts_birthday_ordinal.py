@@ -0,0 +1,50 @@
+"""Add contacts birthday ordinal
+
+Revision ID: a41f6c83e0d5
+Revises: 5d7b2e9c1a38
+Create Date: 2026-10-18 15:03:12.774019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6c83e0d5'
+down_revision: Union[str, None] = '5d7b2e9c1a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+"""birthday_ordinal is month * 100 + day of the birthday; it is backfilled from the existing
+birthdays before being made NOT NULL and indexed together with user_id."""
+
+BACKFILL = {
+    'postgresql': "EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)",
+    'sqlite': "CAST(strftime('%m', birthday) AS INTEGER) * 100 + CAST(strftime('%d', birthday) AS INTEGER)",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    op.add_column('contacts', sa.Column('birthday_ordinal', sa.SmallInteger(), nullable=True))
+    op.execute(f"UPDATE contacts SET birthday_ordinal = {BACKFILL.get(dialect, BACKFILL['postgresql'])}")
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.alter_column('birthday_ordinal', existing_type=sa.SmallInteger(), nullable=False)
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_contacts_user_id_birthday_ordinal', 'contacts', ['user_id', 'birthday_ordinal'],
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_contacts_user_id_birthday_ordinal', 'contacts', ['user_id', 'birthday_ordinal'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_birthday_ordinal', table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('birthday_ordinal')
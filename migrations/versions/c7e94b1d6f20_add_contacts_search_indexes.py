@@ -0,0 +1,58 @@
+"""Add contacts trigram and full-text search indexes
+
+Revision ID: c7e94b1d6f20
+Revises: a41f6c83e0d5
+Create Date: 2026-10-18 16:12:35.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.database.search import SQLITE_DDL, SQLITE_DROP
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e94b1d6f20'
+down_revision: Union[str, None] = 'a41f6c83e0d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+"""PostgreSQL gets generated search_text and search_vector columns with pg_trgm and tsvector GIN
+indexes, built CONCURRENTLY. SQLite gets the FTS5 trigram table that create_all makes for new
+databases, with its triggers, filled from the existing contacts."""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+    if dialect != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""ALTER TABLE contacts ADD COLUMN IF NOT EXISTS search_text text
+        GENERATED ALWAYS AS (lower(name || ' ' || last_name || ' ' || email || ' ' || phone)) STORED""")
+    op.execute("""ALTER TABLE contacts ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', name || ' ' || last_name || ' ' || email || ' ' || phone)) STORED""")
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_search_text_trgm "
+                   "ON contacts USING gin (search_text gin_trgm_ops)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_search_vector "
+                   "ON contacts USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DROP:
+            op.execute(statement)
+    if dialect != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_contacts_search_vector")
+    op.execute("DROP INDEX IF EXISTS ix_contacts_search_text_trgm")
+    op.execute("ALTER TABLE contacts DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE contacts DROP COLUMN IF EXISTS search_text")
@@ -0,0 +1,70 @@
+"""Add contacts email domain and created_at indexes
+
+Revision ID: e3a8d51f9b72
+Revises: c7e94b1d6f20
+Create Date: 2026-10-18 17:05:51.336218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.search import SQLITE_TRIGGERS
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a8d51f9b72'
+down_revision: Union[str, None] = 'c7e94b1d6f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+"""email_domain is the lower-cased part of the email after the last @; it is backfilled from the
+existing emails before being made NOT NULL. Together with created_at it backs the filters and
+sort orders of GET /contacts. SQLite recreates contacts in batch mode, which drops the triggers
+of the contacts_fts search table, so they are created again afterwards."""
+
+BACKFILL = {
+    'postgresql': "lower(substring(email from '[^@]*$'))",
+    'sqlite': "lower(replace(email, rtrim(email, replace(email, '@', '')), ''))",
+}
+
+INDEXES = [
+    ('ix_contacts_user_id_email_domain', ['user_id', 'email_domain']),
+    ('ix_contacts_user_id_created_at', ['user_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    op.add_column('contacts', sa.Column('email_domain', sa.String(length=100), nullable=True))
+    op.execute(f"UPDATE contacts SET email_domain = {BACKFILL.get(dialect, BACKFILL['postgresql'])}")
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.alter_column('email_domain', existing_type=sa.String(length=100), nullable=False)
+    _restore_search_triggers(dialect)
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES:
+                op.create_index(name, 'contacts', columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, columns in INDEXES:
+            op.create_index(name, 'contacts', columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('email_domain')
+    _restore_search_triggers(op.get_context().dialect.name)
+
+
+def _restore_search_triggers(dialect: str):
+    """Recreate the contacts_fts triggers that a batch mode table copy drops on SQLite."""
+    if dialect == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
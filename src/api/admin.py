@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends
+
+from src.database.db import sessionmanager
+from src.repository.contacts import ContactRepository
+from src.services.auth import get_current_admin
+from src.services.cache import access_token_cache, user_cache
+from src.services.hashing import hash_pool
+from src.services.rate_limit import limiter
+from src.services.response_cache import contact_cache
+
+
+"""API router for administrator-only operational endpoints"""
+
+router = APIRouter(prefix="/admin", tags=["admin"],
+                   dependencies=[Depends(get_current_admin)])
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """Report database connection pool usage and checkout wait times."""
+    return sessionmanager.pool_stats()
+
+
+@router.get("/password-hashing")
+async def password_hashing_stats():
+    """Report the password hashing pool's in-flight calls, queue depth and rejections."""
+    return hash_pool.stats()
+
+
+@router.get("/db-statements")
+async def db_statement_stats():
+    """Report compiled statement cache hits and the statement shapes built for contact reads."""
+    return {
+        "compiled_cache": sessionmanager.compiled_cache_stats(),
+        "contact_lists": ContactRepository._list_statement.cache_info()._asdict(),
+        "birthdays": ContactRepository._birthday_statement.cache_info()._asdict(),
+    }
+
+
+@router.get("/response-cache")
+async def response_cache_stats():
+    """Report this worker's contact response cache hits, 304 answers and the bytes they saved."""
+    return contact_cache.stats()
+
+
+@router.get("/auth-stats")
+async def auth_stats():
+    """Report this worker's access token and user cache hits and its rate limit rejections."""
+    return {
+        "access_tokens": access_token_cache.stats(),
+        "users": user_cache.stats(),
+        "rate_limit": limiter.stats(),
+    }
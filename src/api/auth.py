@@ -3,7 +3,8 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas import TokenRefreshRequest, UserCreate, Token, User
-from src.services.auth import create_access_token, Hash, create_refresh_token, verify_refresh_token, get_email_from_token
+from src.services.auth import access_token_claims, create_access_token, Hash, verify_refresh_token, get_email_from_token
+from src.services.refresh_tokens import RefreshTokenService
 from src.services.users import UserService
 from src.database.db import get_db
 from src.services.email import send_email
@@ -32,7 +33,7 @@ async def register_user(user_data: UserCreate, bg_tasks: BackgroundTasks, reques
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this name is exist",
         )
-    user_data.password = Hash().get_password_hash(user_data.password)
+    user_data.password = await Hash().get_password_hash_async(user_data.password)
     new_user = await user_service.create_user(user_data)
     bg_tasks.add_task(send_email, new_user.email,
                       new_user.username, str(request.base_url))
@@ -41,12 +42,16 @@ async def register_user(user_data: UserCreate, bg_tasks: BackgroundTasks, reques
 
 @router.post("/login", response_model=Token)
 async def login_user(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
     """Login a user and return access and refresh tokens."""
+    """Each login starts a separate refresh token session, so several devices can stay signed in."""
     user_service = UserService(db)
     user = await user_service.get_user_by_username(form_data.username)
-    if not user or not Hash().verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await Hash().verify_and_update_async(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Wrong login or password",
@@ -58,12 +63,10 @@ async def login_user(
             detail="Електронна адреса не підтверджена",
         )
 
-    access_token = await create_access_token(data={"sub": user.username})
-    refresh_token = await create_refresh_token(data={"sub": user.username})
-    user.refresh_token = refresh_token
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    access_token = await create_access_token(data=access_token_claims(user))
+    if new_hash:
+        user.hashed_password = new_hash
+    refresh_token = await RefreshTokenService(db).issue(user, request.headers.get("user-agent"))
 
     return {
         "access_token": access_token,
@@ -75,20 +78,32 @@ async def login_user(
 @router.post("/refresh-token", response_model=Token)
 async def new_token(request: TokenRefreshRequest, db: AsyncSession = Depends(get_db)):
     """Refresh access token using a valid refresh token."""
-    user = await verify_refresh_token(request.refresh_token, db)
-    if user is None:
+    """The refresh token is rotated: the old one is revoked and a new one is returned."""
+    session = await verify_refresh_token(request.refresh_token, db)
+    new_refresh_token = await RefreshTokenService(db).rotate(session) if session is not None else None
+    if new_refresh_token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
         )
-    new_access_token = await create_access_token(data={"sub": user.username})
+    new_access_token = await create_access_token(data=access_token_claims(session.user))
     return {
         "access_token": new_access_token,
-        "refresh_token": request.refresh_token,
+        "refresh_token": new_refresh_token,
         "token_type": "bearer",
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: TokenRefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke the refresh token session of the current device."""
+    if not await RefreshTokenService(db).revoke(request.refresh_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+
+
 @router.get("/confirm-email/{token}")
 async def confirm_email(token: str, db: AsyncSession = Depends(get_db)):
     """Confirm user's email using a token."""
@@ -1,12 +1,18 @@
-from typing import List
-from fastapi import HTTPException, Depends, APIRouter, status
+from datetime import date
+from typing import Callable, List, Literal, Optional
+from fastapi import HTTPException, Depends, APIRouter, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas import ContactResponse, ContactCreate, ContactUpdate
-from src.database.db import get_db
+from src.schemas import ContactFilters, ContactImportReport, ContactResponse, ContactCreate, ContactUpdate, Principal
+from src.database.db import get_db, get_session_factory
 from src.database.models import User
-from src.services.auth import get_current_user
+from src.services.auth import get_current_principal, get_current_user
+from src.services.contact_export import MEDIA_TYPES, ContactExportService
+from src.services.contact_import import FORMATS, ContactImportService
 from src.services.contacts import ContactService
+from src.services.response_cache import contact_cache
+from src.services.serialization import dump_contact, dump_contacts
 
 
 """API router for contact-related endpoints"""
@@ -14,66 +20,164 @@ from src.services.contacts import ContactService
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """Split a comma-separated fields parameter; None selects every field."""
+    names = tuple(dict.fromkeys(name.strip() for name in (fields or "").split(",") if name.strip()))
+    return names or None
+
+
+FIELDS = Query(None, description="Comma-separated contact fields to return, such as id,name,email; all by default")
+
+
+def next_page_link(request: Request, cursor: str) -> str:
+    """Build a Link header value pointing at the page after cursor."""
+    return f'<{request.url.remove_query_params("skip").include_query_params(after=cursor)}>; rel="next"'
+
+
 @router.get("/", response_model=List[ContactResponse])
 async def get_contacts(
-        skip: int = 0,
-        limit: int = 10,
-        db: AsyncSession = Depends(get_db),
-        user: User = Depends(get_current_user)) -> List[ContactResponse]:
-    """Get a list of contacts for the current user with pagination."""
+        request: Request,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(10, ge=1, le=100),
+        after: Optional[str] = None,
+        sort: str = "id",
+        filters: ContactFilters = Depends(),
+        fields: Optional[str] = FIELDS,
+        sessions: Callable = Depends(get_session_factory),
+        user: Principal = Depends(get_current_principal)) -> List[ContactResponse]:
+    """Get a list of contacts for the current user with filtering, sorting and pagination."""
+    """sort is id, last_name or created_at, prefixed with - for descending order. Filters are
+    last_name, name (only together with last_name), email_domain and a created_after /
+    created_before range; other fields and combinations are rejected with 400 because no index
+    serves them. When there are more contacts, a Link header with rel="next" carries an after
+    cursor; following it is keyset pagination, which stays fast on deep pages and does not skip or
+    repeat rows under concurrent writes. skip is kept for offset pagination. fields limits the
+    returned fields, and only those columns are read."""
+    """Like the other contact reads, responses are cached per user until their next contact
+    write and carry an ETag; sending it back in If-None-Match gets 304 Not Modified while
+    nothing has changed."""
+    if after is not None and skip:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Use either skip or after, not both")
+    names = parse_fields(fields)
 
-    service = ContactService(db)
-    contacts = await service.get_contacts(user, skip=skip, limit=limit)
+    async def render():
+        async with sessions(user.id) as db:
+            contacts, next_cursor = await ContactService(db).get_contacts(
+                user, skip=skip, limit=limit, after=after, sort=sort, filters=filters, fields=names)
+        headers = {"Link": next_page_link(request, next_cursor)} if next_cursor else {}
+        return dump_contacts(contacts, names), headers
 
-    if not contacts and contacts != []:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="No contacts found")
-    return [ContactResponse.from_orm(contact) for contact in contacts]
+    return await contact_cache.respond(request, user.id, render)
 
 
 @router.get("/search", response_model=List[ContactResponse])
-async def search_contacts(query: str, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    """Search for contacts by name or email."""
+async def search_contacts(
+        request: Request,
+        query: str,
+        limit: int = Query(20, ge=1, le=100),
+        after: Optional[str] = None,
+        fields: Optional[str] = FIELDS,
+        sessions: Callable = Depends(get_session_factory),
+        user: Principal = Depends(get_current_principal)):
+    """Search for contacts by name or email, best matches first."""
+    """Results are paginated by cursor: when there are more, a Link header with rel="next" points to the next page."""
     if not query:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Query parameter is required")
+    names = parse_fields(fields)
 
-    service = ContactService(db)
-    contacts = await service.search_contacts(query, user)
-
-    if not contacts:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="No contacts found. Please check your query.")
+    async def render():
+        async with sessions(user.id) as db:
+            contacts, next_cursor = await ContactService(db).search_contacts(query, user, limit, after, names)
+        if not contacts:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="No contacts found. Please check your query.")
+        headers = {"Link": next_page_link(request, next_cursor)} if next_cursor else {}
+        return dump_contacts(contacts, names), headers
 
-    return contacts
+    return await contact_cache.respond(request, user.id, render)
 
 
 @router.get("/birthdays", response_model=List[ContactResponse])
-async def get_birthdays_in_next_days(days: int = 7, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)) -> List[ContactResponse]:
-    """Get contacts with birthdays in the next specified number of days."""
+async def get_birthdays_in_next_days(request: Request, days: int = 7, limit: int = Query(50, ge=1, le=500), fields: Optional[str] = FIELDS, sessions: Callable = Depends(get_session_factory), user: Principal = Depends(get_current_principal)) -> List[ContactResponse]:
+    """Get contacts with birthdays in the next specified number of days, soonest first."""
     if days <= 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Days must be a positive integer")
+    names = parse_fields(fields)
+
+    async def render():
+        async with sessions(user.id) as db:
+            contacts = await ContactService(db).get_birthdays_in_next_days(days, user, limit, names)
+        if not contacts:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"No birthdays found in the next {days} days.")
+        return dump_contacts(contacts, names), {}
+
+    return await contact_cache.respond(request, user.id, render, vary=date.today().isoformat())
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts(
+        request: Request,
+        format: Literal["ndjson", "csv", "vcf"] = "ndjson",
+        sessions: Callable = Depends(get_session_factory),
+        user: Principal = Depends(get_current_principal)) -> StreamingResponse:
+    """Export all contacts of the current user as NDJSON, CSV or vCard."""
+    """The file is streamed from a server-side cursor as it is read, so exports of any size start
+    at once and use the same memory. It is gzip-compressed when the Accept-Encoding header allows it."""
+    gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers = {"Content-Disposition": f'attachment; filename="contacts.{format}"', "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    service = ContactExportService(sessions)
+    return StreamingResponse(service.export(user, format, gzip), media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@router.post("/import", response_model=ContactImportReport)
+async def import_contacts(
+        request: Request,
+        format: Optional[Literal["csv", "ndjson"]] = None,
+        import_id: Optional[str] = Query(None, pattern=r"^[A-Za-z0-9_-]{1,64}$"),
+        db: AsyncSession = Depends(get_db),
+        user: User = Depends(get_current_user)) -> ContactImportReport:
+    """Import contacts from a CSV or NDJSON request body, updating contacts whose email already exists."""
+    """The body is parsed as it streams in and written in batches, so files of any size use the
+    same memory. The format comes from the format parameter or the Content-Type header. Pass an
+    import_id to poll GET /contacts/import/{import_id} for progress while a large file uploads;
+    the response reports imported rows and the rows rejected with their validation errors."""
+    content_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    fmt = format or FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Send text/csv or application/x-ndjson, or pass format")
+
+    service = ContactImportService(db)
+    return await service.run(user, request.stream(), fmt, import_id)
 
-    service = ContactService(db)
-    contacts = await service.get_birthdays_in_next_days(days, user)
-    if not contacts:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail=f"No birthdays found in the next {days} days.")
-    return contacts
+
+@router.get("/import/{import_id}", response_model=ContactImportReport)
+async def get_import_progress(import_id: str, db: AsyncSession = Depends(get_db), user: Principal = Depends(get_current_principal)) -> ContactImportReport:
+    """Get the progress of one of the current user's contact imports."""
+    return await ContactImportService(db).get_progress(user, import_id)
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
-async def get_contact_by_id(contact_id: int, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)) -> ContactResponse:
+async def get_contact_by_id(request: Request, contact_id: int, sessions: Callable = Depends(get_session_factory), user: Principal = Depends(get_current_principal)) -> ContactResponse:
     """Get a contact by its ID."""
-    service = ContactService(db)
-    contact = await service.get_contact_by_id(contact_id, user)
+    async def render():
+        async with sessions(user.id) as db:
+            contact = await ContactService(db).get_contact_by_id(contact_id, user)
 
-    if not contact:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+        if not contact:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+
+        return dump_contact(contact), {}
 
-    return ContactResponse.from_orm(contact)
+    return await contact_cache.respond(request, user.id, render)
 
 
 @router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
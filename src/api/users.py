@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Request, UploadFile, File, Body, HTTPException
 from fastapi.responses import JSONResponse
-from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from src.schemas import PasswordUpdateRequest, User, UserUpdatePassword
 from src.services.auth import Hash, get_current_user
+from src.services.cache import user_cache
+from src.services.refresh_tokens import RefreshTokenService
 from limiter import limiter
 from src.database.db import get_db
 from src.conf.config import config
@@ -17,14 +18,8 @@ from src.services.users import UserService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-rate_limit_store = {}
 
-MAX_REQUESTS = 2
-TIME_WINDOW = timedelta(minutes=1)
-
-
-@router.get("/me", response_model=User)
-@limiter.limit("5/minute")
+@router.get("/me", response_model=User, dependencies=[Depends(limiter.limit("users_me"))])
 async def me(request: Request, user: User = Depends(get_current_user)):
     """Get the current user's information with rate limiting."""
     return user
@@ -58,18 +53,20 @@ async def update_avatar_user(passwords: PasswordUpdateRequest = Body(...), user:
     user_id = user.id
     user_service = UserService(db)
     old_user = await user_service.get_current_user_password(user_id)
-    if not Hash().verify_password(passwords.old_password, old_user.hashed_password):
+    if not await Hash().verify_password_async(passwords.old_password, old_user.hashed_password):
         raise HTTPException(status_code=400, detail="Wrong current password.")
 
     if passwords.new_password1 != passwords.new_password2:
         raise HTTPException(
             status_code=400, detail="New passwords do not match.")
 
-    new_hashed_password = Hash().get_password_hash(passwords.new_password1)
+    new_hashed_password = await Hash().get_password_hash_async(passwords.new_password1)
     old_user.hashed_password = new_hashed_password
+    old_user.token_version = (old_user.token_version or 0) + 1
 
-    await db.commit()
+    await RefreshTokenService(db).revoke_all(old_user.id)
     await db.refresh(old_user)
+    await user_cache.revoke_tokens(old_user.username, old_user.token_version)
 
     return UserUpdatePassword(
         id=old_user.id,
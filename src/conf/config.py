@@ -8,11 +8,25 @@ This module defines the settings required for the application to run,"""
 
 class Settings(BaseSettings):
     DB_URL: str
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 5.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 60 * 30
+    DB_POOL_WARM_UP: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_COMPILED_CACHE_SIZE: int = 1000
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_READ_YOUR_WRITES_PREFIX: str = "db-pin"
 
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    AUTH_CLAIMS_ONLY: bool = False
 
     MAIL_SMTP_USERNAME: str
     MAIL_SMTP_PASSWORD: str
@@ -21,6 +35,55 @@ class Settings(BaseSettings):
 
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_DB: int = 0
+    REDIS_POOL_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 2.0
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    USER_CACHE_TTL_SECONDS: int = 60 * 15
+    USER_CACHE_LOCAL_MAXSIZE: int = 10_000
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 30
+    USER_CACHE_INVALIDATION_CHANNEL: str = "user-cache:invalidate"
+    USER_CACHE_SCHEMA_VERSION: int = 3
+    USER_CACHE_TTL_JITTER: float = 0.1
+    USER_CACHE_EARLY_REFRESH: float = 0.1
+    USER_TOKEN_VERSIONS_KEY: str = "user-token-versions"
+    ACCESS_TOKEN_CACHE_MAXSIZE: int = 10_000
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_CALIBRATE: bool = True
+    PASSWORD_HASH_TARGET_MS: int = 250
+    PASSWORD_HASH_CALIBRATION_KEY: str = "password-hash-calibration"
+    PASSWORD_HASH_CALIBRATION_TTL_SECONDS: int = 24 * 60 * 60
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 16
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 2
+
+    RATE_LIMITS: dict[str, str] = {
+        "default": "120/minute",
+        "auth": "20/minute",
+        "users": "60/minute",
+        "users_me": "5/minute",
+        "contacts": "120/minute",
+    }
+    RATE_LIMIT_PREFIX: str = "rate-limit"
+
+    CONTACT_IMPORT_BATCH_SIZE: int = 1000
+    CONTACT_IMPORT_MAX_ERRORS: int = 1000
+    CONTACT_IMPORT_PROGRESS_TTL_SECONDS: int = 60 * 60 * 24
+    CONTACT_IMPORT_PROGRESS_PREFIX: str = "contact-import"
+    CONTACT_EXPORT_BATCH_SIZE: int = 1000
+
+    CONTACT_CACHE_PREFIX: str = "contact-cache"
+    CONTACT_CACHE_TTL_SECONDS: int = 60 * 5
+    CONTACT_CACHE_MAX_BODY_BYTES: int = 256 * 1024
 
     CLOUDINARY_NAME: str
     CLOUDINARY_API_KEY: str
@@ -1,26 +1,192 @@
+import asyncio
 import contextlib
+import time
+from collections import Counter
 
-from sqlalchemy.exc import SQLAlchemyError
+from redis.exceptions import RedisError
+from sqlalchemy import event, make_url, text
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 
 """Database session manager for handling async database sessions."""
 
 from src.conf.config import config
+from src.database.redis import RedisManager, redis_manager
+from src.services.cache import TTLCache
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+def engine_options(url: str) -> dict:
+    """Build create_async_engine keyword arguments for url from the settings."""
+    """Pool sizing is skipped for in-memory SQLite, which needs a single static connection,
+    and the prepared statement cache sizes are only passed to asyncpg: statement_cache_size for
+    asyncpg's own cache and prepared_statement_cache_size for the per-connection cache of the
+    SQLAlchemy dialect, which prepares every statement it runs."""
+    options = {
+        "echo": config.DB_ECHO,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE_SECONDS,
+        "query_cache_size": config.DB_COMPILED_CACHE_SIZE,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def _warm_up_engine(engine: AsyncEngine):
+    """Open the pool's minimum number of connections at once and return them to the pool."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return []
+    return [engine.connect().start() for _ in range(pool.size())]
+
+
+def _count_compiled_cache(engine: AsyncEngine, counts: Counter):
+    """Count, by CacheStats, whether each statement the engine runs came from its compiled cache."""
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counts[context.cache_hit] += 1
+
+
+def _engine_pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": pool.status()}
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            wait_avg_ms=round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            wait_max_ms=round(pool.wait_max * 1000, 3),
+        )
+    return stats
+
+
+class TrackedSession(Session):
+    """Session that remembers whether it wrote, so its user can be pinned to the primary."""
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _mark_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(TrackedSession, "after_commit")
+def _pin_writer(session):
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        session.info["manager"].pin(user_id)
+
+
+@event.listens_for(TrackedSession, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
+
+
+class Replica:
+    """A read replica engine together with its health and in-flight session count."""
+
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine: AsyncEngine = create_async_engine(url, **engine_options(url))
+        self.session_maker: async_sessionmaker = async_sessionmaker(
+            autoflush=False, autocommit=False, expire_on_commit=False, bind=self.engine
+        )
+        self.healthy = True
+        self.in_use = 0
 
 
 class DatabaseSessionManager:
     """Manages database sessions for asynchronous operations."""
+    """Writes always go to the primary. Reads may be routed to optional replicas, balanced by
+    in-flight sessions with round-robin tie breaking; unhealthy replicas are skipped until a
+    background health check sees them answer again, and reads fall back to the primary when no
+    replica is available. A user who has just committed a write is pinned to the primary for a
+    short window so they read their own writes despite replication lag."""
 
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url, echo=True)
+    def __init__(
+        self,
+        url: str,
+        replica_urls: list[str] | None = None,
+        redis: RedisManager | None = None,
+        pin_seconds: float = 0,
+        pin_prefix: str = "db-pin",
+        health_check_interval: float = 10,
+    ):
+        self._engine: AsyncEngine | None = create_async_engine(url, **engine_options(url))
         self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+            autoflush=False, autocommit=False, expire_on_commit=False, bind=self._engine,
+            sync_session_class=TrackedSession, info={"manager": self},
         )
+        self._replicas = [Replica(replica_url) for replica_url in replica_urls or []]
+        self._next_replica = 0
+        self._compiled_cache = Counter()
+        for engine in [self._engine] + [replica.engine for replica in self._replicas]:
+            _count_compiled_cache(engine, self._compiled_cache)
+        self._redis = redis
+        self.pin_seconds = pin_seconds
+        self.pin_prefix = pin_prefix
+        self.pins = TTLCache(maxsize=10_000, ttl=pin_seconds or 1)
+        self.health_check_interval = health_check_interval
+        self._health_checker: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replicas)
 
     @contextlib.asynccontextmanager
     async def session(self):
@@ -35,12 +201,197 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    def pin(self, user_id: int):
+        """Route the user's reads to the primary for the read-your-writes window."""
+        if not self._replicas or not self.pin_seconds:
+            return
+        self.pins.set(user_id, True)
+        if self._redis is not None:
+            task = asyncio.get_running_loop().create_task(self._publish_pin(user_id))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _publish_pin(self, user_id: int):
+        try:
+            await self._redis.client.set(f"{self.pin_prefix}:{user_id}", 1, px=int(self.pin_seconds * 1000))
+        except RedisError as e:
+            print(f"Failed to share read-your-writes pin: {e}")
+
+    async def is_pinned(self, user_id: int) -> bool:
+        """Tell whether the user wrote recently on this or any other worker."""
+        if self.pins.get(user_id):
+            return True
+        if self._redis is None:
+            return False
+        try:
+            return bool(await self._redis.client.exists(f"{self.pin_prefix}:{user_id}"))
+        except RedisError:
+            return True
+
+    def _pick_replica(self) -> Replica | None:
+        self._next_replica = (self._next_replica + 1) % len(self._replicas)
+        ordered = self._replicas[self._next_replica:] + self._replicas[:self._next_replica]
+        return min((replica for replica in ordered if replica.healthy),
+                   key=lambda replica: replica.in_use, default=None)
+
+    @contextlib.asynccontextmanager
+    async def replica_session(self, user_id: int | None = None):
+        """Yield a session on a healthy replica, or None when the read should use the primary."""
+        """None is yielded when there are no healthy replicas, the user is pinned to the primary,
+        or the chosen replica cannot be reached; in the last case it is marked unhealthy."""
+        replica = None
+        if self._replicas and not (user_id is not None and await self.is_pinned(user_id)):
+            replica = self._pick_replica()
+        if replica is None:
+            yield None
+            return
+
+        replica.in_use += 1
+        session = replica.session_maker()
+        try:
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as e:
+                replica.healthy = False
+                print(f"Replica {replica.name} is unavailable, reading from the primary: {e}")
+                session = None
+            yield session
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                replica.healthy = False
+            raise
+        finally:
+            replica.in_use -= 1
+            if session is not None:
+                await session.close()
+
+    @contextlib.asynccontextmanager
+    async def read_session(self, user_id: int | None = None):
+        """Yield a session for reads, on a replica when replica_session picks one and on the primary otherwise."""
+        async with self.replica_session(user_id) as replica:
+            if replica is not None:
+                yield replica
+                return
+        async with self.session() as session:
+            yield session
 
-sessionmanager = DatabaseSessionManager(config.DB_URL)
+    async def check_replicas(self):
+        """Probe every replica once and update its health."""
+        for replica in self._replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), self.health_check_interval)
+                healthy = True
+            except (DBAPIError, OSError, asyncio.TimeoutError):
+                healthy = False
+            if healthy != replica.healthy:
+                print(f"Replica {replica.name} is now {'healthy' if healthy else 'unhealthy'}")
+            replica.healthy = healthy
+
+    async def _check_replicas_forever(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_replicas()
+
+    def start(self):
+        """Start the background replica health checks."""
+        if self._replicas and self._health_checker is None:
+            self._health_checker = asyncio.create_task(self._check_replicas_forever())
+
+    async def stop(self):
+        """Stop the background replica health checks."""
+        if self._health_checker is not None:
+            self._health_checker.cancel()
+            try:
+                await self._health_checker
+            except asyncio.CancelledError:
+                pass
+            self._health_checker = None
+
+    async def warm_up(self):
+        """Open every pool's minimum number of connections at once so the first requests do not pay for connecting."""
+        engines = [self._engine] + [replica.engine for replica in self._replicas]
+        results = await asyncio.gather(
+            *(connect for engine in engines for connect in _warm_up_engine(engine)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if not isinstance(result, BaseException):
+                await result.close()
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    def pool_stats(self) -> dict:
+        """Report checked-out, idle and overflow connections and the time spent waiting for one."""
+        stats = _engine_pool_stats(self._engine)
+        if self._replicas:
+            stats["replicas"] = [
+                {"name": replica.name, "healthy": replica.healthy, "in_use": replica.in_use,
+                 **_engine_pool_stats(replica.engine)}
+                for replica in self._replicas
+            ]
+        return stats
+
+    def compiled_cache_stats(self) -> dict:
+        """Report how many statements, on the primary and the replicas, reused their compiled SQL."""
+        """Statements SQLAlchemy cannot cache, such as driver-level SQL, count as uncached."""
+        hits = self._compiled_cache[CacheStats.CACHE_HIT]
+        misses = self._compiled_cache[CacheStats.CACHE_MISS]
+        cached = self._engine.sync_engine._compiled_cache
+        return {
+            "hits": hits,
+            "misses": misses,
+            "uncached": sum(self._compiled_cache.values()) - hits - misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "size": len(cached) if cached is not None else 0,
+            "capacity": config.DB_COMPILED_CACHE_SIZE,
+        }
+
+    async def close(self):
+        """Dispose of every engine and close every pooled connection."""
+        await self.stop()
+        for replica in self._replicas:
+            await replica.engine.dispose()
+        if self._engine is not None:
+            await self._engine.dispose()
+
+
+sessionmanager = DatabaseSessionManager(
+    config.DB_URL,
+    replica_urls=config.DB_REPLICA_URLS,
+    redis=redis_manager,
+    pin_seconds=config.DB_READ_YOUR_WRITES_SECONDS,
+    pin_prefix=config.DB_READ_YOUR_WRITES_PREFIX,
+    health_check_interval=config.DB_REPLICA_HEALTH_CHECK_INTERVAL,
+)
+
+
+async def release_connection(session: AsyncSession):
+    """Return the connection of a session that has only read back to the pool."""
+    """A session checks out a connection on its first statement and holds it until its
+    transaction ends. Ending a read-only transaction early frees the connection for other
+    requests while this one goes on with non-database work; the next statement checks out a
+    connection again. Sessions with writes or pending changes are left to their owner."""
+    if not session.in_transaction() or session.info.get("wrote"):
+        return
+    if session.new or session.dirty or session.deleted:
+        return
+    await session.commit()
 
 
 async def get_db():
     """Dependency to get a database session."""
-    """Provides a database session for the request."""
+    """Provides a database session for the request. No connection is checked out until the
+    session runs its first statement, so requests that never query do not touch the pool."""
     async with sessionmanager.session() as session:
         yield session
+
+
+def get_session_factory():
+    """Dependency to get a factory of read sessions taking the user id."""
+    """A read session is opened only when the factory is called, on a replica when one is
+    available, and closed as soon as the reads are done. Read endpoints call it only when the
+    response is not cached, and streamed bodies use it because get_db's session is closed when
+    the endpoint returns, before a StreamingResponse body is sent."""
+    return sessionmanager.read_session
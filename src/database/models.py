@@ -1,14 +1,27 @@
 from datetime import datetime, date
 from typing import Optional
 
-from sqlalchemy import Integer, String, func, ForeignKey
-from sqlalchemy.orm import mapped_column, Mapped, DeclarativeBase, relationship
+from sqlalchemy import Integer, SmallInteger, String, event, func, ForeignKey, Index
+from sqlalchemy.orm import mapped_column, Mapped, DeclarativeBase, relationship, validates
 from sqlalchemy.sql.sqltypes import DateTime, Date, Boolean
 
+from src.database.search import create_contact_search, drop_contact_search
+
 
 """Base models for the database, defining User and Contact models with relationships."""
 
 
+def birthday_ordinal(day: date) -> int:
+    """Encode the month and day of a date as month * 100 + day, so 29 February is 229."""
+    """Ordinals sort in calendar order regardless of year, which makes upcoming birthdays a range scan."""
+    return day.month * 100 + day.day
+
+
+def email_domain(email: str) -> str:
+    """Return the lower-cased part of an email address after the last @."""
+    return email.rpartition("@")[2].lower()
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -27,7 +40,8 @@ class User(Base):
         DateTime, server_default=func.now())
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
-    refresh_token: Mapped[str] = mapped_column(String, nullable=True)
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0")
     contacts: Mapped[list["Contact"]] = relationship(
         "Contact",
         back_populates="user",
@@ -41,14 +55,25 @@ class User(Base):
 class Contact(Base):
     """Contact model representing a contact associated with a user."""
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_last_name_name",
+              "user_id", "last_name", "name"),
+        Index("uq_contacts_user_id_email", "user_id", "email", unique=True),
+        Index("ix_contacts_user_id_birthday_ordinal",
+              "user_id", "birthday_ordinal"),
+        Index("ix_contacts_user_id_email_domain", "user_id", "email_domain"),
+        Index("ix_contacts_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(30), nullable=False)
     last_name: Mapped[str] = mapped_column(String(50), nullable=False)
-    email: Mapped[str] = mapped_column(
-        String(100), nullable=False, unique=True)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
+    email_domain: Mapped[str] = mapped_column(String(100), nullable=False)
     phone: Mapped[str] = mapped_column(String(15), nullable=False)
     birthday: Mapped[date] = mapped_column(Date, nullable=False)
+    birthday_ordinal: Mapped[int] = mapped_column(SmallInteger, nullable=False)
     additional_info: Mapped[Optional[str]] = mapped_column(
         String(255), nullable=True)
     user_id: Mapped[int] = mapped_column(
@@ -59,5 +84,54 @@ class Contact(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), onupdate=func.now())
 
+    @staticmethod
+    def with_derived_values(values: dict) -> dict:
+        """Add the derived columns to the column values of an INSERT or UPDATE statement."""
+        """Statements bypass the validators that keep email_domain and birthday_ordinal in step."""
+        values = dict(values)
+        if values.get("email") is not None:
+            values["email_domain"] = email_domain(values["email"])
+        if values.get("birthday") is not None:
+            values["birthday_ordinal"] = birthday_ordinal(values["birthday"])
+        return values
+
+    @validates("email")
+    def _set_email_domain(self, key, email: str) -> str:
+        """Keep email_domain in step with email whenever it is assigned."""
+        self.email_domain = email_domain(email)
+        return email
+
+    @validates("birthday")
+    def _set_birthday_ordinal(self, key, birthday: date) -> date:
+        """Keep birthday_ordinal in step with birthday whenever it is assigned."""
+        self.birthday_ordinal = birthday_ordinal(birthday)
+        return birthday
+
     def __repr__(self):
         return f"Contact(id={self.id}, name={self.name}, last_name={self.last_name}, email={self.email})"
+
+
+event.listen(Contact.__table__, "after_create", create_contact_search)
+event.listen(Contact.__table__, "before_drop", drop_contact_search)
+
+
+class RefreshToken(Base):
+    """Refresh token session issued to one device of a user."""
+    """Only the SHA-256 hash of the token is stored; lookups go through its unique index."""
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user: Mapped[User] = relationship("User")
+    token_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True)
+    device: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"RefreshToken(id={self.id}, user_id={self.user_id}, device={self.device})"
@@ -0,0 +1,71 @@
+import redis.asyncio as redis
+
+from src.conf.config import config
+
+
+"""Redis connection manager providing a shared asynchronous connection pool."""
+
+
+class RedisManager:
+    """Manages a pooled asynchronous Redis client shared by the whole application."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        max_connections: int = 50,
+        pool_timeout: float | None = None,
+        socket_timeout: float | None = None,
+        socket_connect_timeout: float | None = None,
+        health_check_interval: int = 0,
+    ):
+        self._pool_options = dict(
+            host=host,
+            port=port,
+            db=db,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            health_check_interval=health_check_interval,
+        )
+        self._pool: redis.BlockingConnectionPool | None = None
+        self._client: redis.Redis | None = None
+
+    def connect(self) -> redis.Redis:
+        """Create the connection pool and client if they do not exist yet."""
+        """Connections are opened lazily by the pool on first use."""
+        if self._client is None:
+            self._pool = redis.BlockingConnectionPool(**self._pool_options)
+            self._client = redis.Redis(connection_pool=self._pool)
+        return self._client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self.connect()
+
+    async def close(self):
+        """Close the client and disconnect every pooled connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            await self._pool.aclose()
+        self._client = None
+        self._pool = None
+
+
+redis_manager = RedisManager(
+    host=config.REDIS_HOST,
+    port=config.REDIS_PORT,
+    db=config.REDIS_DB,
+    max_connections=config.REDIS_POOL_MAX_CONNECTIONS,
+    pool_timeout=config.REDIS_POOL_TIMEOUT,
+    socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+)
+
+
+async def get_redis() -> redis.Redis:
+    """Dependency to get the shared Redis client."""
+    return redis_manager.client
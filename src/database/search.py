@@ -0,0 +1,65 @@
+from sqlalchemy import Connection, Table, text
+
+
+"""Full-text and trigram search structures for the contacts table.
+
+PostgreSQL gets generated search_text and search_vector columns with pg_trgm and tsvector GIN
+indexes. SQLite, used for local runs and tests, gets an FTS5 trigram index kept in step with
+contacts by triggers.
+"""
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """ALTER TABLE contacts ADD COLUMN IF NOT EXISTS search_text text
+        GENERATED ALWAYS AS (lower(name || ' ' || last_name || ' ' || email || ' ' || phone)) STORED""",
+    """ALTER TABLE contacts ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', name || ' ' || last_name || ' ' || email || ' ' || phone)) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_contacts_search_text_trgm ON contacts USING gin (search_text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_contacts_search_vector ON contacts USING gin (search_vector)",
+]
+
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts (rowid, name, last_name, email, phone)
+        VALUES (new.id, new.name, new.last_name, new.email, new.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts (contacts_fts, rowid, name, last_name, email, phone)
+        VALUES ('delete', old.id, old.name, old.last_name, old.email, old.phone);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+        INSERT INTO contacts_fts (contacts_fts, rowid, name, last_name, email, phone)
+        VALUES ('delete', old.id, old.name, old.last_name, old.email, old.phone);
+        INSERT INTO contacts_fts (rowid, name, last_name, email, phone)
+        VALUES (new.id, new.name, new.last_name, new.email, new.phone);
+    END""",
+]
+"""Triggers that keep contacts_fts in step with contacts. SQLite drops them together with the
+table, so migrations that recreate contacts in batch mode run them again."""
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        name, last_name, email, phone, content='contacts', content_rowid='id', tokenize='trigram')""",
+    *SQLITE_TRIGGERS,
+    "INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS contacts_fts_update",
+    "DROP TRIGGER IF EXISTS contacts_fts_delete",
+    "DROP TRIGGER IF EXISTS contacts_fts_insert",
+    "DROP TABLE IF EXISTS contacts_fts",
+]
+
+
+def create_contact_search(target: Table, connection: Connection, **kw):
+    """Create the search columns, indexes or FTS table right after the contacts table."""
+    statements = {"postgresql": POSTGRES_DDL, "sqlite": SQLITE_DDL}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def drop_contact_search(target: Table, connection: Connection, **kw):
+    """Drop the SQLite FTS table, which is not removed together with the contacts table."""
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS contacts_fts"))
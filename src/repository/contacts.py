@@ -1,93 +1,382 @@
-from typing import List
-from sqlalchemy import select, func
+import calendar
+import functools
+from typing import AsyncIterator, Collection, List, Sequence
+from sqlalchemy import DateTime, Row, String, and_, bindparam, case, column, delete, func, insert, literal, or_, select, table, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from src.database.models import Contact, User
-from src.schemas import ContactModel, ContactResponse, ContactUpdate
+from src.database.models import Contact, User, birthday_ordinal, email_domain
+from src.repository.pagination import InvalidCursor, decode_cursor, encode_cursor
+from src.schemas import ContactFilters, ContactModel, ContactResponse, ContactUpdate
+from src.services.response_cache import ResponseCache, contact_cache
 
 
 """Repository for managing contacts in the database."""
 
+SORTS = {
+    "id": (),
+    "last_name": (Contact.last_name, Contact.name),
+    "created_at": (Contact.created_at,),
+}
+"""Sort orders of the contact list and the columns they sort by before id, each led by a per-user index."""
+
+FILTER_COLUMNS = {
+    "last_name": Contact.last_name,
+    "name": Contact.name,
+    "email_domain": Contact.email_domain,
+}
+
+FILTER_INDEXES = [
+    ("last_name", "name"),
+    ("email_domain",),
+    ("created_at",),
+]
+"""Columns after user_id of the per-user indexes filters can use; equality filters must cover a prefix of one."""
+
+
+class UnsupportedQuery(ValueError):
+    """Raised for sort orders or filter combinations that would scan all of a user's contacts."""
+
+
+CONTACT_COLUMNS = {name: getattr(Contact, name) for name in ContactResponse.model_fields}
+"""Columns contact reads can return, by the ContactResponse field each fills."""
+
+STATEMENT_CACHE_SIZE = 1024
+"""Statement shapes kept per builder; each holds one select construct and its memoized cache key."""
+
+CONTACT_BY_ID = select(Contact).where(Contact.id == bindparam("contact_id"), Contact.user_id == bindparam("user_id"))
+
+
+UPSERT_COLUMNS = ["name", "last_name", "email_domain", "phone", "birthday", "birthday_ordinal", "additional_info"]
+"""Columns written by a contact import besides the (user_id, email) conflict key."""
+
+EXPORT_COLUMNS = (Contact.id, Contact.name, Contact.last_name, Contact.email, Contact.phone,
+                  Contact.birthday, Contact.additional_info, Contact.created_at, Contact.updated_at)
+"""Columns of a contact export, selected as plain rows so no ORM objects are built."""
+
+SQLITE_FTS = table("contacts_fts", column("rowid"), column("name"),
+                   column("last_name"), column("email"), column("phone"))
+
+
+def _columns(fields: Collection[str] | None, *required) -> list:
+    """Columns selecting the requested fields and the columns the query itself needs."""
+    """Selecting columns rather than the Contact entity skips building, instrumenting and
+    tracking ORM objects. Raises UnsupportedQuery for unknown fields."""
+    if fields is None:
+        return list(CONTACT_COLUMNS.values())
+    unknown = set(fields) - CONTACT_COLUMNS.keys()
+    if unknown:
+        raise UnsupportedQuery(
+            f"Unknown fields {', '.join(sorted(unknown))}; use any of {', '.join(CONTACT_COLUMNS)}")
+    names = set(fields) | {column.key for column in required}
+    return [column for name, column in CONTACT_COLUMNS.items() if name in names]
+
 
 class ContactRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: ResponseCache = contact_cache):
         self.db = session
+        self.cache = cache
+
+    async def get_contacts(
+        self,
+        user: User,
+        skip: int = 0,
+        limit: int = 10,
+        after: str | None = None,
+        sort: str = "id",
+        filters: ContactFilters | None = None,
+        fields: Collection[str] | None = None,
+    ) -> tuple[List[Row], str | None]:
+        """Get a page of contacts for the current user, filtered and sorted."""
+        """sort is a key of SORTS, prefixed with - for descending order; id breaks ties. With after,
+        the page starts right behind the row the cursor points at (keyset pagination); otherwise
+        skip rows are skipped. Returns the page and the cursor of the next page, or None on the
+        last page. Raises UnsupportedQuery for sort orders or filter combinations that no index serves."""
+        """Like the other list reads, it returns plain rows holding the requested fields (all
+        fields by default) rather than Contact entities."""
+        if sort.lstrip("-") not in SORTS:
+            raise UnsupportedQuery(f"Cannot sort by {sort.lstrip('-')}; use one of {', '.join(SORTS)}")
+        keys = SORTS[sort.lstrip("-")] + (Contact.id,)
+
+        params = {"user_id": user.id, "limit": limit + 1, **self._filter_params(filters or ContactFilters())}
+        if after is not None:
+            cursor_sort, *values = decode_cursor(after, str, *(self._cursor_type(key) for key in keys))
+            if cursor_sort != sort:
+                raise InvalidCursor("Cursor does not match the requested sort order")
+            params.update((f"after_{key.key}", self._cursor_value(key, value)) for key, value in zip(keys, values))
+        else:
+            params["offset"] = skip
+        text_datetimes = after is not None and self.db.bind.dialect.name == "sqlite"
+        stmt = self._list_statement(sort, None if fields is None else frozenset(fields),
+                                    tuple(sorted(params)), text_datetimes)
+        result = await self.db.execute(stmt, params)
+        contacts = result.all()
+
+        next_cursor = None
+        if len(contacts) > limit:
+            contacts = contacts[:limit]
+            next_cursor = encode_cursor(sort, *(getattr(contacts[-1], key.key) for key in keys))
+        return contacts, next_cursor
 
-    async def get_contacts(self, user: User, skip: int = 0, limit: int = 10) -> List[ContactModel]:
-        """Get a list of contacts for the current user with pagination."""
-        query = select(Contact).filter(Contact.user_id ==
-                                       user.id).offset(skip).limit(limit)
-        result = await self.db.execute(query)
-        return result.scalars().all()
+    @staticmethod
+    @functools.lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+    def _list_statement(sort: str, fields: frozenset | None, params: tuple[str, ...], text_datetimes: bool):
+        """Build the contact list statement for one shape of request, every value a bound parameter."""
+        """A shape is the sort order, the fields and the names of the parameters given; requests
+        of the same shape reuse the statement, along with its cache key and compiled SQL."""
+        descending = sort.startswith("-")
+        keys = SORTS[sort.lstrip("-")] + (Contact.id,)
+        stmt = select(*_columns(fields, *keys)).where(Contact.user_id == bindparam("user_id"))
+        stmt = stmt.where(*(column == bindparam(f"filter_{name}")
+                            for name, column in FILTER_COLUMNS.items() if f"filter_{name}" in params))
+        if "created_after" in params:
+            stmt = stmt.where(Contact.created_at >= bindparam("created_after"))
+        if "created_before" in params:
+            stmt = stmt.where(Contact.created_at < bindparam("created_before"))
+        if "offset" in params:
+            stmt = stmt.offset(bindparam("offset"))
+        else:
+            values = [
+                bindparam(f"after_{key.key}", type_=String() if text_datetimes and isinstance(key.type, DateTime) else key.type)
+                for key in keys
+            ]
+            stmt = stmt.where(tuple_(*keys) < tuple_(*values) if descending else tuple_(*keys) > tuple_(*values))
+        stmt = stmt.order_by(*(key.desc() if descending else key for key in keys))
+        return stmt.limit(bindparam("limit"))
+
+    @staticmethod
+    def _filter_params(filters: ContactFilters) -> dict:
+        """Turn filters into statement parameters, rejecting combinations that do not start a per-user index."""
+        equal = {field: value for field, value in filters.model_dump(include=set(FILTER_COLUMNS)).items()
+                 if value is not None}
+        if equal and not any(set(index[:len(equal)]) == equal.keys() for index in FILTER_INDEXES):
+            allowed = [" with ".join(index[:size]) for index in FILTER_INDEXES if index[0] in FILTER_COLUMNS
+                       for size in range(1, len(index) + 1)]
+            raise UnsupportedQuery(
+                f"Cannot filter by {' with '.join(equal)}; filter by one of {', '.join(allowed)}")
+
+        if "email_domain" in equal:
+            equal["email_domain"] = email_domain(equal["email_domain"])
+        params = {f"filter_{field}": value for field, value in equal.items()}
+        if filters.created_after is not None:
+            params["created_after"] = filters.created_after
+        if filters.created_before is not None:
+            params["created_before"] = filters.created_before
+        return params
+
+    @staticmethod
+    def _cursor_type(key) -> type:
+        """Return the type a cursor holds for a sort key; datetimes are kept as ISO text."""
+        return str if isinstance(key.type, DateTime) else key.type.python_type
+
+    def _cursor_value(self, key, value):
+        """Restore a sort key value read back from a cursor to the type the column compares with."""
+        """SQLite stores datetimes as text, so they are compared as the text the cursor holds."""
+        if not isinstance(key.type, DateTime) or self.db.bind.dialect.name == "sqlite":
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidCursor("Malformed cursor")
 
     async def get_contact_by_id(self, contact_id: int, user: User):
         """Get a contact by its ID for the current user."""
-        contact = await self.db.execute(
-            select(Contact).filter(Contact.id ==
-                                   contact_id, Contact.user_id == user.id)
-        )
+        contact = await self.db.execute(CONTACT_BY_ID, {"contact_id": contact_id, "user_id": user.id})
         return contact.scalars().first()
 
     async def create_contact(self, contact: ContactModel, user: User) -> ContactModel:
         """Create a new contact for the current user."""
-        result = Contact(**contact.model_dump(), user_id=user.id)
-        self.db.add(result)
+        """A single INSERT ... RETURNING yields the stored row, including server defaults."""
+        values = Contact.with_derived_values({**contact.model_dump(), "user_id": user.id})
+        result = await self.db.execute(insert(Contact).values(**values).returning(Contact))
+        db_contact = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(result)
-        return result
+        await self.cache.bump(user.id)
+        return db_contact
 
     async def update_contact(self, contact_id: int, contact_data: ContactUpdate, user: User) -> ContactResponse | None:
         """Update an existing contact for the current user."""
+        """A single UPDATE ... RETURNING both checks ownership and yields the updated row."""
+        values = Contact.with_derived_values(contact_data.model_dump(exclude_unset=True))
+        if not values:
+            return await self.get_contact_by_id(contact_id, user)
+
         result = await self.db.execute(
-            select(Contact).filter(Contact.id ==
-                                   contact_id, Contact.user_id == user.id)
+            update(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .values(**values)
+            .returning(Contact)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
-        db_contact = result.scalars().first()
-        if db_contact:
-            for key, value in contact_data.model_dump(exclude_unset=True).items():
-                setattr(db_contact, key, value)
-            await self.db.commit()
-            await self.db.refresh(db_contact)
-
-            return db_contact
-
-        return None
+        db_contact = result.scalar_one_or_none()
+        if db_contact is None:
+            return None
+        await self.db.commit()
+        await self.cache.bump(user.id)
+        return db_contact
 
     async def delete_contact(self, contact_id: int, user: User) -> ContactModel | None:
         """Delete a contact by its ID for the current user."""
-        q_contact = await self.get_contact_by_id(contact_id, user)
-        if q_contact:
-            await self.db.delete(q_contact)
-            await self.db.commit()
-
-        return q_contact
-
-    async def search_contacts(self, query: str, user: User) -> List[ContactResponse]:
-        """Search for contacts by name, last name, email, or phone number."""
-        stmt = select(Contact).where(
-            (Contact.name.ilike(f'%{query}%')) |
-            (Contact.last_name.ilike(f'%{query}%')) |
-            (Contact.email.ilike(f'%{query}%')) |
-            (Contact.phone.ilike(f'%{query}%'))
-        ).where(Contact.user_id == user.id)
-        result = await self.db.execute(stmt)
-        contacts = result.scalars().all()
-
-        return [ContactResponse.model_validate(contact) for contact in contacts]
-
-    async def get_birthdays(self, days: int, user: User) -> List[ContactResponse]:
-        """Get contacts with birthdays in the next specified number of days."""
-        today = datetime.today()
+        """A single DELETE ... RETURNING yields the deleted row, or None if the user has no such contact."""
+        result = await self.db.execute(
+            delete(Contact)
+            .where(Contact.id == contact_id, Contact.user_id == user.id)
+            .returning(Contact)
+            .execution_options(synchronize_session=False)
+        )
+        db_contact = result.scalar_one_or_none()
+        if db_contact is None:
+            return None
+        await self.db.commit()
+        await self.cache.bump(user.id)
+        return db_contact
+
+    async def upsert_contacts(self, rows: List[dict], user: User) -> int:
+        """Insert a batch of validated contacts for the user, updating those whose email already exists."""
+        """On asyncpg the batch is loaded with COPY into a temporary staging table and merged with
+        one INSERT ... ON CONFLICT on (user_id, email); other drivers run the upsert with
+        executemany. Rows repeating an email keep the last one. Commits and returns the number of
+        contacts written."""
+        by_email = {row["email"]: Contact.with_derived_values({**row, "user_id": user.id}) for row in rows}
+        if not by_email:
+            return 0
+        dialect = self.db.bind.dialect
+        if dialect.driver == "asyncpg":
+            await self._copy_upsert(list(by_email.values()))
+        else:
+            insert_ = pg_insert if dialect.name == "postgresql" else sqlite_insert
+            await self.db.execute(self._upsert(insert_(Contact.__table__)), list(by_email.values()))
+        await self.db.commit()
+        await self.cache.bump(user.id)
+        return len(by_email)
+
+    async def _copy_upsert(self, rows: List[dict]):
+        await self.db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS contacts_import ("
+            "user_id integer, email varchar(100), name varchar(30), last_name varchar(50), "
+            "email_domain varchar(100), phone varchar(15), birthday date, birthday_ordinal smallint, "
+            "additional_info varchar(255)) ON COMMIT DROP"
+        ))
+        columns = ["user_id", "email", *UPSERT_COLUMNS]
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "contacts_import",
+            records=[tuple(row.get(name) for name in columns) for row in rows],
+            columns=columns,
+        )
+        staging = table("contacts_import", *(column(name) for name in columns))
+        await self.db.execute(self._upsert(pg_insert(Contact.__table__).from_select(columns, select(*staging.c))))
+
+    @staticmethod
+    def _upsert(stmt):
+        """Turn an INSERT into contacts into an upsert on the per-user email."""
+        return stmt.on_conflict_do_update(
+            index_elements=["user_id", "email"],
+            set_={name: stmt.excluded[name] for name in UPSERT_COLUMNS} | {"updated_at": func.now()},
+        )
+
+    async def stream_contacts(self, user: User, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """Yield all of the user's contacts in id order, batch_size rows at a time."""
+        """Rows come from a server-side cursor, so only one batch is held in memory however many
+        contacts the user has; each row has the fields of EXPORT_COLUMNS."""
+        result = await self.db.stream(
+            select(*EXPORT_COLUMNS)
+            .filter(Contact.user_id == user.id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def search_contacts(self, query: str, user: User, limit: int = 20, after: str | None = None, fields: Collection[str] | None = None) -> tuple[List[Row], str | None]:
+        """Search for contacts by name, last name, email, or phone number, best matches first."""
+        """On PostgreSQL matches come from the tsvector and pg_trgm indexes, so substrings and
+        typos are found; on SQLite from the FTS5 trigram index. Returns one page of results and
+        the cursor of the next page, or None on the last page."""
+        dialect = self.db.bind.dialect.name
+        match, rank = self._search_match(dialect, query.strip())
+        ranked = (
+            select(Contact.id.label("id"), rank.label("rank"))
+            .select_from(Contact)
+            .where(Contact.user_id == user.id, match)
+        )
+        if dialect != "postgresql":
+            ranked = ranked.join(SQLITE_FTS, SQLITE_FTS.c.rowid == Contact.id)
+        ranked = ranked.subquery()
+
+        stmt = select(*_columns(fields, Contact.id), ranked.c.rank).join(ranked, ranked.c.id == Contact.id)
+        if after is not None:
+            last_rank, last_id = decode_cursor(after, float, int)
+            stmt = stmt.where(or_(
+                ranked.c.rank < last_rank,
+                and_(ranked.c.rank == last_rank, ranked.c.id > last_id),
+            ))
+        stmt = stmt.order_by(ranked.c.rank.desc(), ranked.c.id).limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+        return rows, next_cursor
+
+    @staticmethod
+    def _search_match(dialect: str, query: str):
+        """Build the match predicate and relevance score of a search query for the dialect."""
+        if dialect == "postgresql":
+            search_text = column("search_text")
+            ts_query = func.websearch_to_tsquery("simple", query)
+            match = or_(
+                column("search_vector").op("@@")(ts_query),
+                search_text.contains(query.lower(), autoescape=True),
+                literal(query.lower()).op("<%")(search_text),
+            )
+            rank = func.greatest(
+                func.ts_rank(column("search_vector"), ts_query),
+                func.word_similarity(query.lower(), search_text),
+            )
+            return match, rank
+
+        terms = query.split()
+        if terms and min(len(term) for term in terms) >= 3:
+            phrase = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            return text("contacts_fts MATCH :phrase").bindparams(phrase=phrase), -func.bm25(text("contacts_fts"))
+        pattern = f"%{query}%"
+        return or_(*(getattr(SQLITE_FTS.c, name).like(pattern) for name in ("name", "last_name", "email", "phone"))), literal(0.0)
+
+    async def get_birthdays(self, days: int, user: User, limit: int = 50, today: date | None = None, fields: Collection[str] | None = None) -> List[Row]:
+        """Get contacts with birthdays in the next specified number of days, soonest first."""
+        """The window is one range scan on (user_id, birthday_ordinal), or two when it wraps past
+        31 December. In years without 29 February those birthdays are celebrated on 1 March.
+        Windows longer than 366 days cover the whole year, like a 366-day window does."""
+        today = today or date.today()
+        days = min(days, 366)
         end = today + timedelta(days=days)
-        days_range = [
-            (today + timedelta(days=i)).strftime("%m-%d")
-            for i in range((end - today).days + 1)
-        ]
-        birthday_days = func.to_char(Contact.birthday, "MM-DD")
-        stmt = select(Contact).where(birthday_days.in_(
-            days_range), Contact.user_id == user.id)
-        result = await self.db.execute(stmt)
-        contacts = result.scalars().all()
-
-        return [ContactResponse.model_validate(contact) for contact in contacts]
+        start_ordinal = birthday_ordinal(today)
+        end_ordinal = birthday_ordinal(end)
+        if start_ordinal == 301 and not calendar.isleap(today.year):
+            start_ordinal = 229
+
+        stmt = self._birthday_statement(None if fields is None else frozenset(fields),
+                                        whole_year=days >= 366, wraps=end.year != today.year)
+        result = await self.db.execute(
+            stmt, {"user_id": user.id, "start": start_ordinal, "end": end_ordinal, "limit": limit})
+        return result.all()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+    def _birthday_statement(fields: frozenset | None, whole_year: bool, wraps: bool):
+        """Build the upcoming birthdays statement for one shape of window, every value a bound parameter."""
+        ordinal = Contact.birthday_ordinal
+        start, end = bindparam("start"), bindparam("end")
+        stmt = select(*_columns(fields)).where(Contact.user_id == bindparam("user_id"))
+        if not wraps:
+            stmt = stmt.where(ordinal.between(start, end)).order_by(ordinal, Contact.id)
+        else:
+            if not whole_year:
+                stmt = stmt.where(or_(ordinal >= start, ordinal <= end))
+            stmt = stmt.order_by(case((ordinal >= start, 0), else_=1), ordinal, Contact.id)
+        return stmt.limit(bindparam("limit"))
@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+
+
+"""Opaque cursors for keyset pagination."""
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this server did not issue."""
+
+
+def encode_cursor(*values) -> str:
+    """Pack the sort key values of the last row of a page into an opaque URL-safe token."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> list:
+    """Unpack a token made by encode_cursor holding one value of each of types, in order."""
+    """A value of another type (booleans never count as numbers, integers do count as floats)
+    makes the cursor invalid, so tampered cursors never reach the typed statement parameters."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursor("Malformed cursor")
+    for value, kind in zip(values, types):
+        if isinstance(value, bool) or not isinstance(value, (int, float) if kind is float else kind):
+            raise InvalidCursor("Malformed cursor")
+    return values
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from src.database.models import RefreshToken
+
+
+"""Repository for managing refresh token sessions in the database."""
+
+
+class RefreshTokenRepository:
+    def __init__(self, session: AsyncSession):
+        self.db = session
+
+    async def get_by_hash(self, token_hash: str) -> RefreshToken | None:
+        """Retrieve a refresh token session and its user by the token hash."""
+        """This is a single point lookup on the unique token_hash index."""
+        query = (
+            select(RefreshToken)
+            .options(joinedload(RefreshToken.user))
+            .where(RefreshToken.token_hash == token_hash)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def create(
+        self, user_id: int, token_hash: str, expires_at: datetime, device: str | None = None
+    ) -> RefreshToken:
+        """Add a new refresh token session without committing it."""
+        session = RefreshToken(
+            user_id=user_id, token_hash=token_hash, expires_at=expires_at, device=device
+        )
+        self.db.add(session)
+        return session
+
+    async def revoke(self, session_id: int, revoked_at: datetime) -> bool:
+        """Mark a rotated refresh token session as revoked without committing."""
+        """The row is kept until it expires so that reuse of the old token can be detected.
+        Returns False if the session was already revoked, e.g. by a concurrent rotation."""
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == session_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=revoked_at)
+        )
+        return result.rowcount == 1
+
+    async def delete(self, session_id: int):
+        """Delete a single refresh token session without committing."""
+        await self.db.execute(delete(RefreshToken).where(RefreshToken.id == session_id))
+
+    async def delete_all(self, user_id: int):
+        """Delete every refresh token session of a user without committing."""
+        await self.db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+
+    async def delete_expired(self, user_id: int, now: datetime):
+        """Delete the expired refresh token sessions of a user without committing."""
+        await self.db.execute(
+            delete(RefreshToken).where(
+                RefreshToken.user_id == user_id, RefreshToken.expires_at <= now
+            )
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
@@ -7,6 +7,11 @@ from src.schemas import UserCreate, UserUpdatePassword
 
 """Repository for managing users in the database."""
 
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+"""Lookups built once at import; only their parameters change between calls."""
+
 
 class UserRepository:
     def __init__(self, session: AsyncSession):
@@ -14,62 +19,61 @@ class UserRepository:
 
     async def get_user_by_id(self, user_id: int) -> User | None:
         """Retrieve a user by their ID."""
-        query = select(User).where(User.id == user_id)
-        user = await self.db.execute(query)
+        user = await self.db.execute(USER_BY_ID, {"user_id": user_id})
         return user.scalar_one_or_none()
 
     async def get_user_by_username(self, username: str) -> User | None:
         """Retrieve a user by their username."""
-        query = select(User).where(User.username == username)
-        result = await self.db.execute(query)
+        result = await self.db.execute(USER_BY_USERNAME, {"username": username})
         user = result.scalars().first()
         return user
 
     async def get_user_by_email(self, email: str) -> User | None:
         """Retrieve a user by their email."""
-        query = select(User).where(User.email == email)
-        user = await self.db.execute(query)
+        user = await self.db.execute(USER_BY_EMAIL, {"email": email})
         return user.scalar_one_or_none()
 
     async def create_user(self, body: UserCreate, avatar: str = None) -> User:
         """Create a new user in the database."""
-        user = User(
-            **body.model_dump(exclude_unset=True, exclude={"password"}),
-            hashed_password=body.password,
-            avatar=avatar
+        """A single INSERT ... RETURNING yields the stored row, including server defaults."""
+        result = await self.db.execute(
+            insert(User)
+            .values(
+                **body.model_dump(exclude_unset=True, exclude={"password"}),
+                hashed_password=body.password,
+                avatar=avatar,
+            )
+            .returning(User)
         )
-        self.db.add(user)
+        user = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(user)
         return user
 
     async def verifyed_email(self, email: str):
         """Verify a user's email by setting is_verified to True."""
-        """This method updates the user's is_verified status to True."""
-        query = select(User).where(User.email == email)
-        user = await self.db.execute(query)
-        user = user.scalar_one_or_none()
-        if user:
-            user.is_verified = True
-            self.db.add(user)
-            await self.db.commit()
-            await self.db.refresh(user)
-        return user
+        """This method updates the user's is_verified status to True with a single UPDATE ... RETURNING."""
+        return await self._update_by_email(email, is_verified=True)
 
     async def update_avatar_url(self, email: str, url: str) -> User:
         """Update the avatar URL for a user by their email."""
-        """This method updates the avatar field of the user."""
-        user = await self.get_user_by_email(email)
-        user.avatar = url
-
-        await self.db.commit()
-        await self.db.refresh(user)
+        """This method updates the avatar field of the user with a single UPDATE ... RETURNING."""
+        return await self._update_by_email(email, avatar=url)
 
+    async def _update_by_email(self, email: str, **values) -> User | None:
+        result = await self.db.execute(
+            update(User)
+            .where(User.email == email)
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await self.db.commit()
         return user
 
     async def get_current_user_password(self, user_id: int) -> UserUpdatePassword:
         """Retrieve the current user's password by their ID."""
         """This method returns the user's password information."""
-        query = select(User).where(User.id == user_id)
-        user = await self.db.execute(query)
+        user = await self.db.execute(USER_BY_ID, {"user_id": user_id})
         return user.scalar_one_or_none()
@@ -18,6 +18,25 @@ class User(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CachedUser(User):
+    """Schema for a user stored in the authentication cache."""
+    """Holds only the fields the request path needs; secrets and ORM state are never cached."""
+    avatar: Optional[str] = None
+    is_verified: bool = False
+    token_version: int = 0
+
+
+class Principal(BaseModel):
+    """Schema for an authenticated caller."""
+    """In claims-only mode it is built from access token claims without any cache or database lookup."""
+    id: int
+    username: str
+    is_admin: bool = False
+    is_verified: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UserCreate(BaseModel):
     """Schema for creating a new user."""
     """Includes fields for username, email, password, and admin status."""
@@ -92,3 +111,32 @@ class ContactResponse(ContactModel):
     created_at: datetime
     updated_at: Optional[datetime]
     model_config = ConfigDict(from_attributes=True)
+
+
+class ContactFilters(BaseModel):
+    """Schema for the filters of the contact list."""
+    """Equality filters on last name, name and email domain and a created_at range; each
+    combination must be served by a per-user index."""
+    last_name: Optional[str] = None
+    name: Optional[str] = None
+    email_domain: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class ContactImportError(BaseModel):
+    """Schema for a row of a contact import that was rejected."""
+    """row is the 1-based data row of the file, not counting the CSV header."""
+    row: int
+    errors: list[str]
+
+
+class ContactImportReport(BaseModel):
+    """Schema for the progress and outcome of a contact import."""
+    """errors holds at most CONTACT_IMPORT_MAX_ERRORS rows; failed counts all of them."""
+    import_id: str
+    status: str
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[ContactImportError] = []
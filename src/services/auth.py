@@ -1,18 +1,24 @@
-import redis
-import pickle
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, UTC
 from typing import Optional, Literal
 from fastapi import Depends, HTTPException, status
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
+from redis.exceptions import RedisError
 
-from src.database.db import get_db
+from src.database.db import get_db, release_connection
+from src.database.redis import redis_manager
 from src.conf.config import config
-from src.database.models import User
+from src.database.models import RefreshToken
+from src.repository.refresh_tokens import RefreshTokenRepository
+from src.schemas import CachedUser, Principal
+from src.services.cache import access_token_cache, user_cache
+from src.services.hashing import build_crypt_context, calibrate_crypt_context, hash_pool
 from src.services.users import UserService
 
 
@@ -20,8 +26,45 @@ from src.services.users import UserService
 
 
 class Hash:
-    """Class for hashing and verifying passwords using bcrypt."""
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    """Class for hashing and verifying passwords using bcrypt or argon2."""
+    pwd_context: CryptContext = build_crypt_context(
+        config.PASSWORD_HASH_SCHEME,
+        bcrypt_rounds=config.BCRYPT_ROUNDS,
+        argon2_time_cost=config.ARGON2_TIME_COST,
+        argon2_memory_cost=config.ARGON2_MEMORY_COST_KIB,
+        argon2_parallelism=config.ARGON2_PARALLELISM,
+    )
+
+    @classmethod
+    async def calibrate(cls):
+        """Replace the hashing context with one tuned to PASSWORD_HASH_TARGET_MS on this machine."""
+        """The first worker to calibrate stores the result in Redis and the others load it from there,
+        so every worker hashes with the same cost. Without Redis each worker calibrates on its own."""
+        key = f"{config.PASSWORD_HASH_CALIBRATION_KEY}:{config.PASSWORD_HASH_SCHEME}:{config.PASSWORD_HASH_TARGET_MS}"
+        client = redis_manager.client
+        try:
+            stored = await client.get(key)
+        except RedisError:
+            stored, client = None, None
+        if stored is None:
+            context = await hash_pool.run(
+                calibrate_crypt_context,
+                config.PASSWORD_HASH_SCHEME,
+                config.PASSWORD_HASH_TARGET_MS,
+                config.BCRYPT_MIN_ROUNDS,
+                config.BCRYPT_MAX_ROUNDS,
+                config.ARGON2_MEMORY_COST_KIB,
+                config.ARGON2_PARALLELISM,
+            )
+            stored = context.to_string()
+            if client is not None:
+                try:
+                    if not await client.set(key, stored, ex=config.PASSWORD_HASH_CALIBRATION_TTL_SECONDS, nx=True):
+                        stored = await client.get(key) or stored
+                except RedisError as e:
+                    print(f"Failed to share password hash calibration: {e}")
+        cls.pwd_context = CryptContext.from_string(stored)
+        return cls.pwd_context
 
     def verify_password(self, plain_password, hashed_password):
         """Verify a plain password against a hashed password."""
@@ -33,11 +76,27 @@ class Hash:
         """Returns the hashed password."""
         return self.pwd_context.hash(password)
 
+    def verify_and_update(self, plain_password, hashed_password):
+        """Verify a password and rehash it if its scheme or cost is out of date."""
+        """Returns a (valid, new_hash) tuple; new_hash is None when no rehash is needed."""
+        return self.pwd_context.verify_and_update(plain_password, hashed_password)
+
+    async def verify_password_async(self, plain_password, hashed_password):
+        """Verify a password on the hashing worker pool without blocking the event loop."""
+        return await hash_pool.run(self.verify_password, plain_password, hashed_password)
+
+    async def verify_and_update_async(self, plain_password, hashed_password):
+        """Verify and, if needed, rehash a password on the hashing worker pool."""
+        return await hash_pool.run(self.verify_and_update, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str):
+        """Hash a password on the hashing worker pool without blocking the event loop."""
+        return await hash_pool.run(self.get_password_hash, password)
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 """OAuth2PasswordBearer is a class that provides a way to extract the token from the request.
 It is used to secure endpoints that require authentication."""
-r = redis.Redis(host=config.REDIS_HOST, port=config.REDIS_PORT, db=0)
 
 
 def create_token(
@@ -54,6 +113,21 @@ def create_token(
     return encoded_jwt
 
 
+def access_token_claims(user) -> dict:
+    """Build the access token claims for a user."""
+    """In claims-only mode the token also carries the user id, admin and verification flags
+    and the token version, so read-only endpoints can authenticate without any lookup."""
+    claims = {"sub": user.username}
+    if config.AUTH_CLAIMS_ONLY:
+        claims.update(
+            uid=user.id,
+            is_admin=bool(user.is_admin),
+            is_verified=bool(user.is_verified),
+            ver=user.token_version or 0,
+        )
+    return claims
+
+
 async def create_access_token(data: dict, expires_delta: Optional[int] = None):
     """Create an access token with the given data and optional expiration time."""
     """If expires_delta is provided, it will be used as the expiration time."""
@@ -69,7 +143,9 @@ async def create_access_token(data: dict, expires_delta: Optional[int] = None):
 
 async def create_refresh_token(data: dict, expires_delta: Optional[float] = None):
     """Create a refresh token with the given data and optional expiration time."""
-    """If expires_delta is provided, it will be used as the expiration time."""
+    """If expires_delta is provided, it will be used as the expiration time.
+    Every token gets a unique jti, so tokens issued in the same second never collide."""
+    data = {**data, "jti": uuid.uuid4().hex}
     if expires_delta:
         refresh_token = create_token(data, expires_delta, "refresh")
     else:
@@ -94,51 +170,110 @@ def create_email_token(data: dict, expires_delta: Optional[int] = None):
     return email_token
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current user from the token.
-    This function decodes the JWT token, retrieves the username from the payload
-    and fetches the user from the database or cache.
-    If the user is not found in the cache, it queries the database and caches the user.
-    If the token is invalid or the user is not found, it raises an HTTPException."""
-    """If the user is found, it returns the User object."""
-    credentials_exception = HTTPException(
+def decode_access_token(token: str) -> dict:
+    """Decode and verify an access token, reusing verified payloads until the token expires."""
+    """Payloads are cached by SHA-256 digest of the token, so repeated requests skip parsing and signature checks."""
+    """Raises JWTError if the token is invalid, expired or not an access token."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = access_token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, config.JWT_SECRET, algorithms=[config.JWT_ALGORITHM])
+    if payload.get("token_type") != "access":
+        raise JWTError("Invalid token type")
+    ttl = payload["exp"] - time.time()
+    if ttl > 0:
+        access_token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> CachedUser:
+    """Get the current user from the token.
+    This function decodes the JWT token, retrieves the username from the payload
+    and fetches the user from the in-process cache, Redis or the database.
+    If the user is not found in either cache tier, it queries the database and caches the user;
+    concurrent misses for the same user share a single database lookup.
+    If the token is invalid, revoked or the user is not found, it raises an HTTPException."""
+    """If the user is found, it returns its cached representation. A connection used for the
+    lookup goes back to the pool right away rather than being held through the endpoint."""
     try:
-        payload = jwt.decode(
-            token, config.JWT_SECRET, algorithms=[config.JWT_ALGORITHM]
-        )
+        payload = decode_access_token(token)
         username = payload["sub"]
         if username is None:
-            raise credentials_exception
+            raise credentials_exception()
     except JWTError as e:
-        raise credentials_exception
+        raise credentials_exception()
 
-    user = r.get(f"user: {username}")
+    user = await user_cache.get_or_load(username, UserService(db).get_user_by_username)
+    await release_connection(db)
 
-    if user is None:
-        user_service = UserService(db)
-        user = await user_service.get_user_by_username(username)
-        r.set(f"user: {username}", pickle.dumps(user))
-        r.expire(f"user: {username}", timedelta(minutes=15))
-    else:
-        user = pickle.loads(user)
+    if user is None or payload.get("ver", user.token_version) < user.token_version:
+        raise credentials_exception()
+
+    db.info["user_id"] = user.id
+    return user
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Get the authenticated caller for endpoints that only need the user's identity."""
+    """In claims-only mode the principal is built from the verified token claims with no I/O;
+    tokens whose version was revoked by a password or admin change are rejected.
+    Otherwise, or for tokens issued without claims, it falls back to get_current_user."""
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        raise credentials_exception()
+
+    if config.AUTH_CLAIMS_ONLY and "uid" in payload and "ver" in payload:
+        if payload["ver"] < user_cache.min_token_version(payload["sub"]):
+            raise credentials_exception()
+        return Principal(
+            id=payload["uid"],
+            username=payload["sub"],
+            is_admin=payload.get("is_admin", False),
+            is_verified=payload.get("is_verified", False),
+        )
+
+    user = await get_current_user(token, db)
+    return Principal.model_validate(user)
 
-    if user is None:
-        raise credentials_exception
 
+async def get_current_admin(user: CachedUser = Depends(get_current_user)) -> CachedUser:
+    """Get the current user, rejecting callers who are not administrators."""
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
     return user
 
 
-async def verify_refresh_token(refresh_token: str, db: AsyncSession):
+def hash_refresh_token(refresh_token: str) -> str:
+    """Return the hex SHA-256 digest under which a refresh token is stored."""
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+async def verify_refresh_token(refresh_token: str, db: AsyncSession) -> RefreshToken | None:
     """Verify the refresh token by decoding it and checking the username and token type."""
-    """If the token is valid, it retrieves the user from the database using the username and refresh token."""
-    """If the token is invalid or the user is not found, it returns None."""
+    """If the token is valid, it looks up its session by token hash with a single indexed query.
+    The returned session has its user loaded."""
+    """If the token is invalid, expired or unknown, it returns None. Presenting a token that was
+    already rotated ends every session of that user, since it may have been stolen."""
     try:
         payload = jwt.decode(refresh_token, config.JWT_SECRET,
                              algorithms=[config.JWT_ALGORITHM])
@@ -146,17 +281,23 @@ async def verify_refresh_token(refresh_token: str, db: AsyncSession):
         token_type = payload.get("token_type")
         if username is None or token_type != "refresh":
             return None
+    except JWTError:
+        return None
 
-        stmt = select(User).where(
-            User.username == username,
-            User.refresh_token == refresh_token
-        )
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
+    repository = RefreshTokenRepository(db)
+    session = await repository.get_by_hash(hash_refresh_token(refresh_token))
+    if session is None or session.user.username != username:
+        return None
 
-        return user
-    except JWTError:
+    now = datetime.now(UTC).replace(tzinfo=None)
+    if session.revoked_at is not None:
+        await repository.delete_all(session.user_id)
+        await db.commit()
         return None
+    if session.expires_at <= now:
+        return None
+
+    return session
 
 
 async def get_email_from_token(token: str) -> str:
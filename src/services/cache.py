@@ -0,0 +1,315 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis import RedisManager, redis_manager
+from src.schemas import CachedUser
+
+
+"""In-process and Redis-backed caches used on the authentication path."""
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value or None if it is missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """Store a value, evicting the least recently used entry when full."""
+        """A per-entry ttl overrides the cache-wide default."""
+        if self.maxsize <= 0:
+            return
+        expires_at = self._timer() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+class _Abandoned(Exception):
+    """Set on a SingleFlight call whose caller was cancelled, so its waiters try again."""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key so only one is in flight at a time."""
+    """Callers that arrive while a call is running await its result instead of starting their own.
+    If the caller running the call is cancelled, its waiters are not: the first of them starts
+    the call again and the rest wait for that one."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        while (future := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except _Abandoned:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(_Abandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no other caller was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class UserCache:
+    """Two-tier cache of resolved users: an in-process TTL/LRU in front of Redis."""
+    """Invalidations are broadcast over a Redis pub/sub channel so every worker evicts its local copy."""
+    """Users are stored as schema-versioned CachedUser JSON prefixed with their expiry time;
+    the version is part of the Redis key. Redis TTLs are jittered, and entries close to expiry
+    are refreshed early by a random subset of readers, so hot keys never expire all at once."""
+
+    def __init__(
+        self,
+        redis: RedisManager,
+        maxsize: int,
+        local_ttl: float,
+        redis_ttl: int,
+        channel: str,
+        schema_version: int = 1,
+        token_versions_key: str = "user-token-versions",
+        ttl_jitter: float = 0.0,
+        early_refresh: float = 0.0,
+    ):
+        self._redis = redis
+        self.schema_version = schema_version
+        self.local = TTLCache(maxsize, local_ttl)
+        self.redis_ttl = redis_ttl
+        self.ttl_jitter = ttl_jitter
+        self.early_refresh = early_refresh
+        self.channel = channel
+        self.token_versions_key = token_versions_key
+        self.token_versions: dict[str, int] = {}
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.early_refreshes = 0
+        self._loads = SingleFlight()
+        self._listener: asyncio.Task | None = None
+
+    def key(self, username: str) -> str:
+        """Keys written by other schema versions are never read and simply expire."""
+        return f"user:v{self.schema_version}:{username}"
+
+    @staticmethod
+    def encode(user, expires_at: float) -> bytes:
+        """Serialize a User model or CachedUser to compact JSON prefixed with its expiry timestamp."""
+        payload = CachedUser.model_validate(user).model_dump_json().encode()
+        return b"%.3f|%b" % (expires_at, payload)
+
+    @staticmethod
+    def decode(data: bytes) -> tuple[float, CachedUser] | None:
+        """Deserialize a cached payload into (expires_at, user), returning None if it is unreadable."""
+        expires_at, _, payload = data.partition(b"|")
+        try:
+            return float(expires_at), CachedUser.model_validate_json(payload)
+        except (ValueError, ValidationError):
+            return None
+
+    def _should_refresh_early(self, expires_at: float) -> bool:
+        """Within the early refresh window, refresh with a probability that grows towards expiry."""
+        window = self.redis_ttl * self.early_refresh
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return True
+        return remaining < window and random.random() > remaining / window
+
+    async def get(self, username: str) -> CachedUser | None:
+        """Return the cached user from the local tier, then from Redis."""
+        """Returns None on a miss or when the caller was picked to refresh the entry early."""
+        user = self.local.get(username)
+        if user is not None:
+            return user
+        data = await self._redis.client.get(self.key(username))
+        entry = self.decode(data) if data is not None else None
+        if entry is None:
+            self.redis_misses += 1
+            return None
+        expires_at, user = entry
+        if self._should_refresh_early(expires_at):
+            self.early_refreshes += 1
+            return None
+        self.redis_hits += 1
+        self.local.set(username, user)
+        return user
+
+    async def set(self, username: str, user) -> CachedUser:
+        """Store the user in both tiers with a jittered TTL and return its cached representation."""
+        cached = CachedUser.model_validate(user)
+        self.local.set(username, cached)
+        ttl = max(1, int(self.redis_ttl * random.uniform(1 - self.ttl_jitter, 1)))
+        await self._redis.client.set(
+            self.key(username), self.encode(cached, time.time() + ttl), ex=ttl
+        )
+        return cached
+
+    async def get_or_load(
+        self, username: str, loader: Callable[[str], Awaitable[Any]]
+    ) -> CachedUser | None:
+        """Return the cached user or load it with loader(username) and cache the result."""
+        """Concurrent misses for the same user on this worker share a single load."""
+        user = await self.get(username)
+        if user is not None:
+            return user
+        return await self._loads.do(username, lambda: self._load(username, loader))
+
+    async def _load(self, username: str, loader: Callable[[str], Awaitable[Any]]) -> CachedUser | None:
+        user = await loader(username)
+        if user is None:
+            return None
+        return await self.set(username, user)
+
+    async def invalidate(self, username: str):
+        """Drop the user from Redis and tell every worker to evict its local copy."""
+        self.local.pop(username)
+        client = self._redis.client
+        await client.delete(self.key(username))
+        await client.publish(self.channel, username)
+
+    def min_token_version(self, username: str) -> int:
+        """Return the lowest access token version this worker still accepts for the user."""
+        return self.token_versions.get(username, 0)
+
+    async def revoke_tokens(self, username: str, token_version: int):
+        """Reject access tokens issued with a version below token_version on every worker."""
+        self.token_versions[username] = token_version
+        await self._redis.client.hset(self.token_versions_key, username, token_version)
+        await self.invalidate(username)
+
+    async def _load_token_versions(self):
+        versions = await self._redis.client.hgetall(self.token_versions_key)
+        self.token_versions = {
+            username.decode(): int(version) for username, version in versions.items()
+        }
+
+    def stats(self) -> dict:
+        total = self.redis_hits + self.redis_misses
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_rate": self.redis_hits / total if total else 0.0,
+                "early_refreshes": self.early_refreshes,
+            },
+            "coalesced_loads": self._loads.coalesced,
+        }
+
+    async def _listen(self):
+        """Evict local entries named on the invalidation channel, reconnecting on errors."""
+        """Messages may be lost while disconnected, so the local tier is cleared and revoked
+        token versions are reloaded after each reconnect."""
+        while True:
+            pubsub = self._redis.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self.local.clear()
+                await self._load_token_versions()
+                async for message in pubsub.listen():
+                    username = message["data"]
+                    if isinstance(username, bytes):
+                        username = username.decode()
+                    self.local.pop(username)
+                    version = await self._redis.client.hget(self.token_versions_key, username)
+                    if version is not None:
+                        self.token_versions[username] = int(version)
+            except RedisError as e:
+                print(f"User cache invalidation listener disconnected: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self):
+        """Start the background invalidation listener."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stop the background invalidation listener."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+access_token_cache = TTLCache(
+    maxsize=config.ACCESS_TOKEN_CACHE_MAXSIZE,
+    ttl=config.JWT_EXPIRATION_MINUTES * 60,
+)
+"""Verified access token payloads keyed by token digest; each entry expires at the token's exp."""
+
+user_cache = UserCache(
+    redis_manager,
+    maxsize=config.USER_CACHE_LOCAL_MAXSIZE,
+    local_ttl=config.USER_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl=config.USER_CACHE_TTL_SECONDS,
+    channel=config.USER_CACHE_INVALIDATION_CHANNEL,
+    schema_version=config.USER_CACHE_SCHEMA_VERSION,
+    token_versions_key=config.USER_TOKEN_VERSIONS_KEY,
+    ttl_jitter=config.USER_CACHE_TTL_JITTER,
+    early_refresh=config.USER_CACHE_EARLY_REFRESH,
+)
@@ -0,0 +1,102 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Callable, Sequence
+
+from sqlalchemy import Row
+
+from src.conf.config import config
+from src.repository.contacts import ContactRepository
+from src.schemas import Principal
+from src.services.serialization import dump_contact_lines
+
+
+"""Streaming export of a user's contacts as NDJSON, CSV or vCard."""
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "vcf": "text/vcard; charset=utf-8",
+}
+"""Export formats and the content type each is sent with."""
+
+CSV_HEADER = ["name", "last_name", "email", "phone", "birthday", "additional_info", "id", "created_at", "updated_at"]
+"""CSV columns, led by those a contact import reads so an export can be imported again."""
+
+
+def render_csv(rows: Sequence[Row]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([getattr(row, name) for name in CSV_HEADER] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def vcard_text(value: str) -> str:
+    """Escape a value for a vCard property."""
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def vcard_line(line: str) -> str:
+    """Fold a content line into CRLF-terminated lines of at most 75 octets."""
+    folded, octets = [], 0
+    for char in line:
+        size = len(char.encode())
+        if octets + size > 75:
+            folded.append("\r\n ")
+            octets = 1
+        folded.append(char)
+        octets += size
+    return "".join(folded) + "\r\n"
+
+
+def render_vcf(rows: Sequence[Row]) -> bytes:
+    cards = []
+    for row in rows:
+        lines = [
+            "BEGIN:VCARD",
+            "VERSION:3.0",
+            f"UID:contact-{row.id}",
+            f"N:{vcard_text(row.last_name)};{vcard_text(row.name)};;;",
+            f"FN:{vcard_text(row.name)} {vcard_text(row.last_name)}",
+            f"EMAIL;TYPE=INTERNET:{vcard_text(row.email)}",
+            f"TEL:{vcard_text(row.phone)}",
+            f"BDAY:{row.birthday.isoformat()}",
+        ]
+        if row.additional_info:
+            lines.append(f"NOTE:{vcard_text(row.additional_info)}")
+        lines.append("END:VCARD")
+        cards.extend(vcard_line(line) for line in lines)
+    return "".join(cards).encode()
+
+
+RENDERERS = {"ndjson": dump_contact_lines, "csv": render_csv, "vcf": render_vcf}
+
+
+class ContactExportService:
+    """Streams every contact of a user in one of the export formats."""
+    """Contacts are read from a server-side cursor in batches of CONTACT_EXPORT_BATCH_SIZE and
+    each batch is encoded and sent before the next is fetched, so memory stays flat and the first
+    bytes go out as soon as the first batch arrives. sessions opens the read session, which has to
+    outlive the endpoint because the body is sent after it returns."""
+
+    def __init__(self, sessions: Callable, batch_size: int = config.CONTACT_EXPORT_BATCH_SIZE):
+        self._sessions = sessions
+        self.batch_size = batch_size
+
+    async def export(self, user: Principal, fmt: str, gzip: bool = False) -> AsyncIterator[bytes]:
+        """Yield the encoded export, gzip-compressed when asked for."""
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+        render = RENDERERS[fmt]
+        if fmt == "csv":
+            yield self._compress(",".join(CSV_HEADER).encode() + b"\n", compressor)
+        async with self._sessions(user.id) as db:
+            async for rows in ContactRepository(db).stream_contacts(user, self.batch_size):
+                yield self._compress(render(rows), compressor)
+        if compressor is not None:
+            yield compressor.flush()
+
+    @staticmethod
+    def _compress(data: bytes, compressor) -> bytes:
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
@@ -0,0 +1,206 @@
+import codecs
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.database.models import User
+from src.database.redis import RedisManager, redis_manager
+from src.repository.contacts import ContactRepository
+from src.schemas import ContactCreate, ContactImportError, ContactImportReport
+
+
+"""Streaming bulk import of contacts from CSV or NDJSON uploads."""
+
+FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+"""Upload content types and the import format they select."""
+
+CONTACT_LIST = TypeAdapter(list[ContactCreate])
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a stream of UTF-8 byte chunks into lines without holding more than one chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield (row, record) for each CSV data row, or (row, error message) for malformed rows."""
+    """The first row is the header. Quoted fields may span lines; empty fields become None."""
+    header = None
+    record_lines: list[str] = []
+    quotes = 0
+    row = 0
+    async for line in lines:
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record_lines)
+        record_lines, quotes = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value or None for name, value in zip(header, values)}
+    if record_lines:
+        yield row + 1, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield (row, record) for each non-empty NDJSON line, or (row, error message) for malformed lines."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "Expected a JSON object"
+            continue
+        yield row, record
+
+
+def validate_batch(batch: list[tuple[int, dict]]) -> tuple[list[dict], list[ContactImportError]]:
+    """Validate a batch of records against ContactCreate in one pass."""
+    """Returns the valid contacts and an error per rejected row; valid rows of a batch with
+    errors are validated again on their own."""
+    records = [record for _, record in batch]
+    try:
+        return [contact.model_dump() for contact in CONTACT_LIST.validate_python(records)], []
+    except ValidationError as e:
+        failed = defaultdict(list)
+        for error in e.errors():
+            index, *field = error["loc"]
+            failed[index].append(f"{'.'.join(str(part) for part in field) or 'row'}: {error['msg']}")
+    valid = [
+        ContactCreate.model_validate(record).model_dump()
+        for index, record in enumerate(records) if index not in failed
+    ]
+    errors = [ContactImportError(row=batch[index][0], errors=messages) for index, messages in failed.items()]
+    return valid, errors
+
+
+class ContactImportService:
+    """Imports contacts from a streamed upload in fixed-size batches."""
+    """Only one batch of rows and at most CONTACT_IMPORT_MAX_ERRORS error reports are held in
+    memory, whatever the size of the file. Progress is published to Redis after every batch so
+    it can be polled while a large file is still uploading."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        redis: RedisManager = redis_manager,
+        batch_size: int = config.CONTACT_IMPORT_BATCH_SIZE,
+        max_errors: int = config.CONTACT_IMPORT_MAX_ERRORS,
+    ):
+        self.repository = ContactRepository(db)
+        self._redis = redis
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    @staticmethod
+    def progress_key(user: User, import_id: str) -> str:
+        return f"{config.CONTACT_IMPORT_PROGRESS_PREFIX}:{user.id}:{import_id}"
+
+    async def run(self, user: User, chunks: AsyncIterator[bytes], fmt: str, import_id: str | None = None) -> ContactImportReport:
+        """Import every row of the upload for the user, upserting contacts by email."""
+        report = ContactImportReport(import_id=import_id or uuid.uuid4().hex, status="running")
+        iter_records = iter_csv_records if fmt == "csv" else iter_ndjson_records
+        batch: list[tuple[int, dict]] = []
+        new_errors: list[ContactImportError] = []
+        try:
+            async for row, record in iter_records(iter_lines(chunks)):
+                report.processed += 1
+                if isinstance(record, str):
+                    new_errors += self._record_errors(report, [ContactImportError(row=row, errors=[record])])
+                    continue
+                batch.append((row, record))
+                if len(batch) >= self.batch_size:
+                    new_errors += await self._import_batch(user, report, batch)
+                    await self._publish(user, report, new_errors)
+                    batch, new_errors = [], []
+            if batch:
+                new_errors += await self._import_batch(user, report, batch)
+        except Exception:
+            report.status = "failed"
+            await self._publish(user, report, new_errors)
+            raise
+        report.status = "completed"
+        await self._publish(user, report, new_errors)
+        return report
+
+    async def _import_batch(self, user: User, report: ContactImportReport, batch: list[tuple[int, dict]]) -> list[ContactImportError]:
+        contacts, errors = validate_batch(batch)
+        report.imported += await self.repository.upsert_contacts(contacts, user)
+        return self._record_errors(report, errors)
+
+    def _record_errors(self, report: ContactImportReport, errors: list[ContactImportError]) -> list[ContactImportError]:
+        """Count rejected rows and keep reports for as many as the error cap allows."""
+        report.failed += len(errors)
+        kept = errors[:max(self.max_errors - len(report.errors), 0)]
+        report.errors.extend(kept)
+        return kept
+
+    async def _publish(self, user: User, report: ContactImportReport, new_errors: list[ContactImportError] = ()):
+        key = self.progress_key(user, report.import_id)
+        try:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping=report.model_dump(include={"status", "processed", "imported", "failed"}))
+                pipe.expire(key, config.CONTACT_IMPORT_PROGRESS_TTL_SECONDS)
+                if new_errors:
+                    pipe.rpush(f"{key}:errors", *(error.model_dump_json() for error in new_errors))
+                    pipe.expire(f"{key}:errors", config.CONTACT_IMPORT_PROGRESS_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            print(f"Failed to publish contact import progress: {e}")
+
+    async def get_progress(self, user: User, import_id: str) -> ContactImportReport:
+        """Return the latest published progress of one of the user's imports."""
+        key = self.progress_key(user, import_id)
+        try:
+            progress = await self._redis.client.hgetall(key)
+            errors = await self._redis.client.lrange(f"{key}:errors", 0, -1) if progress else []
+        except RedisError:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Import progress is temporarily unavailable")
+        if not progress:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+        return ContactImportReport(
+            import_id=import_id,
+            **{key.decode(): value.decode() for key, value in progress.items()},
+            errors=[ContactImportError.model_validate_json(error) for error in errors],
+        )
@@ -1,9 +1,12 @@
-from typing import List
+from typing import Collection, List
+from fastapi import HTTPException, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
-from src.repository.contacts import ContactRepository
-from src.schemas import ContactModel, ContactResponse, ContactUpdate
+from src.repository.contacts import ContactRepository, UnsupportedQuery
+from src.repository.pagination import InvalidCursor
+from src.schemas import ContactFilters, ContactModel, ContactResponse, ContactUpdate
 
 
 """Service for managing contacts, providing an interface for CRUD operations."""
@@ -13,8 +16,11 @@ class ContactService:
     def __init__(self, db: AsyncSession):
         self.repository = ContactRepository(db)
 
-    async def get_contacts(self, user, skip: int = 0, limit: int = 10) -> List[ContactModel]:
-        return await self.repository.get_contacts(user, skip, limit)
+    async def get_contacts(self, user, skip: int = 0, limit: int = 10, after: str | None = None, sort: str = "id", filters: ContactFilters | None = None, fields: Collection[str] | None = None) -> tuple[List[Row], str | None]:
+        try:
+            return await self.repository.get_contacts(user, skip, limit, after, sort, filters, fields)
+        except (InvalidCursor, UnsupportedQuery) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     async def get_contact_by_id(self, contact_id: int, user: User) -> ContactResponse | None:
         return await self.repository.get_contact_by_id(contact_id, user)
@@ -28,8 +34,14 @@ class ContactService:
     async def delete_contact(self, contact_id: int, user: User) -> ContactModel | None:
         return await self.repository.delete_contact(contact_id, user)
 
-    async def search_contacts(self, query: str, user: User) -> List[ContactResponse]:
-        return await self.repository.search_contacts(query, user)
-
-    async def get_birthdays_in_next_days(self, days: int, user: User) -> List[ContactResponse]:
-        return await self.repository.get_birthdays(days, user)
+    async def search_contacts(self, query: str, user: User, limit: int = 20, after: str | None = None, fields: Collection[str] | None = None) -> tuple[List[Row], str | None]:
+        try:
+            return await self.repository.search_contacts(query, user, limit, after, fields)
+        except (InvalidCursor, UnsupportedQuery) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def get_birthdays_in_next_days(self, days: int, user: User, limit: int = 50, fields: Collection[str] | None = None) -> List[Row]:
+        try:
+            return await self.repository.get_birthdays(days, user, limit, fields=fields)
+        except UnsupportedQuery as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+from src.conf.config import config
+
+
+"""Password hashing configuration and the bounded worker pool that keeps it off the event loop."""
+
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+def build_crypt_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_time_cost: int = 3,
+    argon2_memory_cost: int = 64 * 1024,
+    argon2_parallelism: int = 2,
+) -> CryptContext:
+    """Build a CryptContext that hashes new passwords with exactly the given parameters."""
+    """Hashes made with another scheme or with fewer bcrypt rounds report needs_update, so logins
+    rehash them. Stronger bcrypt hashes are kept as they are."""
+    if scheme == "argon2" and not argon2.has_backend():
+        print("argon2-cffi is not installed, falling back to bcrypt password hashing")
+        scheme = "bcrypt"
+    schemes = ["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt"]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+def measure_hash_ms(context: CryptContext) -> float:
+    """Return how long one hash takes with the given context, in milliseconds."""
+    started = time.perf_counter()
+    context.hash(CALIBRATION_PASSWORD)
+    return (time.perf_counter() - started) * 1000
+
+
+def calibrate_crypt_context(
+    scheme: str,
+    target_ms: float,
+    bcrypt_min_rounds: int = 10,
+    bcrypt_max_rounds: int = 16,
+    argon2_memory_cost: int = 64 * 1024,
+    argon2_parallelism: int = 2,
+) -> CryptContext:
+    """Pick the most expensive work factor whose hash time stays within target_ms on this machine."""
+    """bcrypt cost doubles per round, argon2 time cost scales linearly; the minimum is never lowered."""
+    context = build_crypt_context(
+        scheme,
+        bcrypt_rounds=bcrypt_min_rounds,
+        argon2_time_cost=1,
+        argon2_memory_cost=argon2_memory_cost,
+        argon2_parallelism=argon2_parallelism,
+    )
+    elapsed = min(measure_hash_ms(context) for _ in range(3))
+    if context.default_scheme() == "argon2":
+        time_cost = max(1, int(target_ms / elapsed))
+        return build_crypt_context(
+            "argon2",
+            bcrypt_rounds=bcrypt_min_rounds,
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=argon2_memory_cost,
+            argon2_parallelism=argon2_parallelism,
+        )
+    extra_rounds = math.floor(math.log2(target_ms / elapsed)) if elapsed < target_ms else 0
+    rounds = min(bcrypt_max_rounds, bcrypt_min_rounds + extra_rounds)
+    return build_crypt_context("bcrypt", bcrypt_rounds=rounds)
+
+
+class PasswordHashPool:
+    """Runs hashing calls on a fixed number of threads with a bounded wait queue."""
+    """When every worker is busy and the queue is full, calls fail fast with 503 instead of piling up."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted calls waiting for a free worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Run func(*args) on the pool and await its result."""
+        """Raises HTTPException 503 when the pool is saturated."""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again later.",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        """Stop the worker threads once queued calls have finished."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hash_pool = PasswordHashPool(
+    max_workers=config.PASSWORD_HASH_WORKERS,
+    max_queue=config.PASSWORD_HASH_MAX_QUEUE,
+)
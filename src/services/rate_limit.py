@@ -0,0 +1,138 @@
+import time
+import uuid
+
+from fastapi import Request
+from jose import JWTError
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis import RedisManager, redis_manager
+from src.services.auth import decode_access_token
+from src.services.cache import TTLCache
+
+
+"""Distributed rate limiter backed by an atomic Redis sliding-window script."""
+
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local member = ARGV[3]
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+    return {1, 0}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 60 * 60 * 24}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a client has used up its quota for the current window."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Parse a rate such as "5/minute" into (limit, window in seconds)."""
+    limit, _, period = rate.partition("/")
+    return int(limit), PERIODS[period.strip().rstrip("s")]
+
+
+class TokenBucket:
+    """Per-worker token bucket holding at most one window's worth of requests."""
+
+    def __init__(self, capacity: int, window: int):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def rate_limit_key(request: Request) -> str:
+    """Identify the caller by authenticated username, falling back to the client IP."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_access_token(token)['sub']}"
+        except (JWTError, KeyError):
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimiter:
+    """Enforces tiered quotas shared by every worker through a single Redis Lua script."""
+    """A local token bucket rejects clients this worker alone has already seen exceed the quota,
+    without a Redis round trip. If Redis is unavailable the limiter falls back to the local buckets."""
+
+    def __init__(self, redis: RedisManager, tiers: dict[str, str], prefix: str = "rate-limit", local_maxsize: int = 10_000):
+        self._redis = redis
+        self.tiers = {tier: parse_rate(rate) for tier, rate in tiers.items()}
+        self.prefix = prefix
+        self.local = TTLCache(local_maxsize, ttl=max(window for _, window in self.tiers.values()))
+        self.local_rejections = 0
+        self.redis_rejections = 0
+        self._script = None
+
+    async def hit(self, tier: str, key: str):
+        """Count one request of key against the tier quota, raising RateLimitExceeded if it is over."""
+        limit, window = self.tiers.get(tier, self.tiers["default"])
+        bucket_key = (tier, key)
+        bucket = self.local.get(bucket_key)
+        if bucket is None:
+            bucket = TokenBucket(limit, window)
+            self.local.set(bucket_key, bucket, ttl=window)
+        if not bucket.take():
+            self.local_rejections += 1
+            raise RateLimitExceeded(retry_after=1 / bucket.rate)
+
+        client = self._redis.client
+        if self._script is None or self._script.registered_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        try:
+            allowed, retry_after_ms = await self._script(
+                keys=[f"{self.prefix}:{tier}:{key}"],
+                args=[window * 1000, limit, uuid.uuid4().hex],
+            )
+        except RedisError as e:
+            print(f"Rate limiter is using local buckets only: {e}")
+            return
+        if not allowed:
+            self.redis_rejections += 1
+            raise RateLimitExceeded(retry_after=retry_after_ms / 1000)
+
+    def limit(self, tier: str):
+        """Build a dependency that applies the tier quota to every route it is attached to."""
+        async def dependency(request: Request):
+            await self.hit(tier, rate_limit_key(request))
+
+        return dependency
+
+    def stats(self) -> dict:
+        return {
+            "local_rejections": self.local_rejections,
+            "redis_rejections": self.redis_rejections,
+            "local_buckets": len(self.local),
+        }
+
+
+limiter = RateLimiter(redis_manager, config.RATE_LIMITS, prefix=config.RATE_LIMIT_PREFIX)
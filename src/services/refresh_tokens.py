@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.database.models import RefreshToken, User
+from src.repository.refresh_tokens import RefreshTokenRepository
+from src.services.auth import create_refresh_token, hash_refresh_token, verify_refresh_token
+
+
+"""Service for issuing, rotating and revoking per-device refresh token sessions."""
+
+
+def utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class RefreshTokenService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repository = RefreshTokenRepository(db)
+
+    async def _add(self, user: User, device: str | None) -> str:
+        refresh_token = await create_refresh_token(data={"sub": user.username})
+        await self.repository.create(
+            user.id,
+            hash_refresh_token(refresh_token),
+            utcnow() + timedelta(minutes=config.REFRESH_TOKEN_EXPIRE_MINUTES),
+            device[:255] if device else None,
+        )
+        return refresh_token
+
+    async def issue(self, user: User, device: str | None = None) -> str:
+        """Start a new refresh token session for one device of the user."""
+        """Other sessions of the user are left untouched; expired ones are cleaned up."""
+        await self.repository.delete_expired(user.id, utcnow())
+        refresh_token = await self._add(user, device)
+        await self.db.commit()
+        return refresh_token
+
+    async def rotate(self, session: RefreshToken) -> str | None:
+        """Revoke a verified session and replace it with a new token for the same device."""
+        """The revoke only succeeds for the first of several concurrent rotations of the same token.
+        Any other one is treated as reuse: every session of the user ends and None is returned."""
+        if not await self.repository.revoke(session.id, utcnow()):
+            await self.repository.delete_all(session.user_id)
+            await self.db.commit()
+            return None
+        refresh_token = await self._add(session.user, session.device)
+        await self.db.commit()
+        return refresh_token
+
+    async def revoke(self, refresh_token: str) -> bool:
+        """End the session of a single refresh token. Returns False if it is not active."""
+        session = await verify_refresh_token(refresh_token, self.db)
+        if session is None:
+            return False
+        await self.repository.delete(session.id)
+        await self.db.commit()
+        return True
+
+    async def revoke_all(self, user_id: int):
+        """End every refresh token session of a user."""
+        await self.repository.delete_all(user_id)
+        await self.db.commit()
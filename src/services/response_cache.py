@@ -0,0 +1,133 @@
+import hashlib
+import time
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response, status
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+from src.database.redis import RedisManager, redis_manager
+
+
+"""Per-user versioned cache of serialized responses with ETag revalidation."""
+
+Render = Callable[[], Awaitable[tuple[bytes, dict[str, str]]]]
+"""Produces a response body and the headers that belong with it."""
+
+
+class ResponseCache:
+    """Caches serialized read responses per user, keyed by a version counter in Redis."""
+    """Every write to a user's data bumps the user's version, so entries cached under older
+    versions are never read again and simply expire. The version is also part of the strong
+    ETag, so a matching If-None-Match is answered with 304 after a single Redis GET, without
+    touching the database. The version key has no TTL; when it is missing it starts from the
+    current time in nanoseconds, so a version lost to eviction never repeats one that cached
+    entries may still carry. Hit counters are kept per worker."""
+
+    def __init__(self, redis: RedisManager, prefix: str, ttl: int, max_body_bytes: int):
+        self._redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_body_bytes = max_body_bytes
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bypassed = 0
+        self.bytes_from_cache = 0
+        self.bytes_not_sent = 0
+
+    def version_key(self, user_id: int) -> str:
+        return f"{self.prefix}:version:{user_id}"
+
+    async def version(self, user_id: int) -> int:
+        """Return the user's current version, starting one if there is none."""
+        client = self._redis.client
+        key = self.version_key(user_id)
+        version = await client.get(key)
+        if version is not None:
+            return int(version)
+        start = time.time_ns()
+        if await client.set(key, start, nx=True):
+            return start
+        return int(await client.get(key))
+
+    async def bump(self, user_id: int):
+        """Move the user to a new version after a committed write."""
+        """Redis errors are printed rather than raised, since the write has already been committed;
+        responses cached before it then live until their TTL."""
+        key = self.version_key(user_id)
+        try:
+            async with self._redis.client.pipeline(transaction=True) as pipe:
+                pipe.set(key, time.time_ns(), nx=True)
+                pipe.incr(key)
+                await pipe.execute()
+        except RedisError as e:
+            print(f"Failed to bump cached responses of user {user_id}: {e}")
+
+    @staticmethod
+    def _digest(request: Request, vary: str) -> str:
+        return hashlib.blake2b(f"{request.url.path}?{request.url.query}|{vary}".encode(), digest_size=8).hexdigest()
+
+    async def respond(self, request: Request, user_id: int, render: Render, vary: str = "") -> Response:
+        """Answer a read request from the cache, or render it and cache the result."""
+        """vary names anything besides the URL and the user's data that the response depends on,
+        such as the current date. The ETag ends with the body size, so a 304 can count the bytes it saved."""
+        try:
+            version = await self.version(user_id)
+        except RedisError:
+            self.bypassed += 1
+            body, headers = await render()
+            return Response(body, media_type="application/json", headers=headers)
+
+        tag = f"{user_id}.{version}.{self._digest(request, vary)}."
+        for candidate in request.headers.get("if-none-match", "").split(","):
+            candidate = candidate.strip()
+            size = candidate[len(tag) + 1:-1]
+            if candidate.startswith(f'"{tag}') and candidate.endswith('"') and size.isdigit():
+                self.not_modified += 1
+                self.bytes_not_sent += int(size)
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                                headers={"ETag": candidate, "Cache-Control": "private, no-cache"})
+
+        key = f"{self.prefix}:{tag}"
+        try:
+            cached = await self._redis.client.get(key)
+        except RedisError:
+            cached = None
+        if cached is not None:
+            self.hits += 1
+            link, _, body = cached.partition(b"\n")
+            self.bytes_from_cache += len(body)
+            headers = {"Link": link.decode()} if link else {}
+        else:
+            self.misses += 1
+            body, headers = await render()
+            if len(body) <= self.max_body_bytes:
+                try:
+                    await self._redis.client.set(key, headers.get("Link", "").encode() + b"\n" + body, ex=self.ttl)
+                except RedisError as e:
+                    print(f"Failed to cache response: {e}")
+
+        headers = {**headers, "ETag": f'"{tag}{len(body)}"', "Cache-Control": "private, no-cache"}
+        return Response(body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.not_modified
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "bypassed": self.bypassed,
+            "hit_rate": (self.hits + self.not_modified) / total if total else 0.0,
+            "bytes_from_cache": self.bytes_from_cache,
+            "bytes_not_sent": self.bytes_not_sent,
+        }
+
+
+contact_cache = ResponseCache(
+    redis_manager,
+    prefix=config.CONTACT_CACHE_PREFIX,
+    ttl=config.CONTACT_CACHE_TTL_SECONDS,
+    max_body_bytes=config.CONTACT_CACHE_MAX_BODY_BYTES,
+)
+"""Cached contact read responses, invalidated by every contact write of the user."""
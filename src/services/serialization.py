@@ -0,0 +1,45 @@
+from typing import Collection, Iterable
+
+import orjson
+
+from src.schemas import ContactResponse
+
+
+"""One-pass JSON encoding of contacts read from the database."""
+
+CONTACT_FIELDS = tuple(ContactResponse.model_fields)
+"""Fields of a contact response, in the order ContactResponse serializes them."""
+
+OPTIONS = orjson.OPT_UTC_Z
+"""Encode UTC datetimes with a Z suffix, as Pydantic does."""
+
+
+def contact_dict(contact, names: tuple[str, ...] = CONTACT_FIELDS) -> dict:
+    """Map a Contact or a row with the same attributes to a plain dict of ContactResponse fields."""
+    return {name: getattr(contact, name) for name in names}
+
+
+def field_names(fields: Collection[str] | None) -> tuple[str, ...]:
+    """Return the requested fields in ContactResponse order, or every field when none are requested."""
+    if fields is None:
+        return CONTACT_FIELDS
+    return tuple(name for name in CONTACT_FIELDS if name in fields)
+
+
+def dump_contact(contact) -> bytes:
+    """Encode a contact as JSON bytes."""
+    """Rows from the database already satisfy ContactResponse, so they are not validated again;
+    the output is the same as ContactResponse's JSON."""
+    return orjson.dumps(contact_dict(contact), option=OPTIONS)
+
+
+def dump_contacts(contacts: Iterable, fields: Collection[str] | None = None) -> bytes:
+    """Encode a list of contacts as a JSON array in one pass, keeping only fields when given."""
+    names = field_names(fields)
+    return orjson.dumps([contact_dict(contact, names) for contact in contacts], option=OPTIONS)
+
+
+def dump_contact_lines(contacts: Iterable) -> bytes:
+    """Encode contacts as newline-delimited JSON."""
+    return b"".join(orjson.dumps(contact_dict(contact), option=OPTIONS | orjson.OPT_APPEND_NEWLINE)
+                    for contact in contacts)
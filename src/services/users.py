@@ -3,6 +3,7 @@ from libgravatar import Gravatar
 
 from src.schemas import UserCreate, UserUpdatePassword
 from src.repository.users import UserRepository
+from src.services.cache import user_cache
 
 
 """Service for managing user-related operations, providing an interface for CRUD operations."""
@@ -32,10 +33,15 @@ class UserService:
         return await self.repository.get_user_by_email(email)
 
     async def verifyed_email(self, email):
-        return await self.repository.verifyed_email(email)
+        user = await self.repository.verifyed_email(email)
+        if user:
+            await user_cache.invalidate(user.username)
+        return user
 
     async def update_avatar_url(self, email: str, url: str):
-        return await self.repository.update_avatar_url(email, url)
+        user = await self.repository.update_avatar_url(email, url)
+        await user_cache.invalidate(user.username)
+        return user
 
     async def get_current_user_password(self, user_id) -> UserUpdatePassword:
         return await self.repository.get_current_user_password(user_id)
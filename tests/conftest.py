@@ -1,15 +1,20 @@
+import contextlib
 import pytest
 import asyncio
+from sqlalchemy import event
 from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from httpx import AsyncClient, ASGITransport
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 
 from src.services.auth import create_access_token
 from main import app
 from src.services.auth import Hash
-from src.database.db import get_db
+from src.database.db import get_db, get_session_factory
+from src.database.redis import redis_manager
+from src.services.cache import user_cache
+from limiter import limiter
 from src.database.models import Base, User, Contact
 
 
@@ -28,16 +33,57 @@ test_user_data = {
 
 
 @pytest.fixture(autouse=True)
-def mock_redis():
-    """Автоматичне мокання глобального Redis-з'єднання."""
-    mock_r = MagicMock()
+def mock_redis(monkeypatch):
+    """Автоматичне мокання спільного асинхронного Redis-клієнта."""
+    mock_r = AsyncMock()
     mock_r.get.return_value = None
     mock_r.set.return_value = True
-    mock_r.expire.return_value = True
+    mock_r.register_script = MagicMock(return_value=AsyncMock(return_value=[1, 0]))
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[])
+    mock_r.pipeline = MagicMock(return_value=pipeline)
+    pipeline.__aenter__.return_value = pipeline
 
-    # ВАЖЛИВО: точно вказуємо імпортовану змінну `r` в auth.py
-    with patch("src.services.auth.r", mock_r):
-        yield mock_r
+    monkeypatch.setattr(redis_manager, "_client", mock_r)
+    user_cache.local.clear()
+    limiter.local.clear()
+    yield mock_r
+    user_cache.local.clear()
+    limiter.local.clear()
+
+
+@pytest.fixture
+def redis_store(mock_redis):
+    """Back get, set and incr of the mocked Redis client with a dict, pipelined calls included."""
+    store = {}
+    queued = []
+
+    async def get(key):
+        return store.get(key)
+
+    async def set_(key, value, ex=None, nx=False):
+        if nx and key in store:
+            return None
+        store[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def incr(key):
+        store[key] = str(int(store.get(key, b"0")) + 1).encode()
+        return int(store[key])
+
+    async def execute():
+        results = [await call for call in queued]
+        queued.clear()
+        return results
+
+    mock_redis.get.side_effect = get
+    mock_redis.set.side_effect = set_
+    mock_redis.incr.side_effect = incr
+    pipeline = mock_redis.pipeline.return_value
+    pipeline.set.side_effect = lambda *args, **kwargs: queued.append(set_(*args, **kwargs))
+    pipeline.incr.side_effect = lambda *args: queued.append(incr(*args))
+    pipeline.execute.side_effect = execute
+    return store
 
 
 @pytest.fixture(scope="session")
@@ -94,13 +140,31 @@ async def client(db_session):
     async def override_get_db():
         yield db_session
 
+    @contextlib.asynccontextmanager
+    async def read_session(user_id=None):
+        yield db_session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: read_session
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
 
+@pytest.fixture
+def statements():
+    """Record the SQL statements sent to the test database."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 def test_user():
     """Фікстура для доступу до даних тестового користувача."""
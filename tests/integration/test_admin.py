@@ -0,0 +1,103 @@
+import pytest
+from httpx import AsyncClient
+
+from src.api import admin as admin_api
+from src.database.db import DatabaseSessionManager
+from src.database.models import User
+from src.services.auth import Hash, create_access_token
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_requires_admin(client: AsyncClient, test_user_token):
+    response = await client.get("/api/admin/db-pool", headers={"Authorization": f"Bearer {test_user_token}"})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_db_pool_stats_for_admin(client: AsyncClient, db_session, tmp_path, monkeypatch):
+    manager = DatabaseSessionManager(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.setattr(admin_api, "sessionmanager", manager)
+    admin = User(
+        username="pooladmin",
+        email="pooladmin@example.com",
+        hashed_password=Hash().get_password_hash("adminpass"),
+        is_verified=True,
+        is_admin=True,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+    token = await create_access_token({"sub": admin.username})
+
+    response = await client.get("/api/admin/db-pool", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert {"checked_out", "idle", "overflow", "wait_avg_ms"} <= response.json().keys()
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_stats_for_admin(client: AsyncClient, db_session):
+    admin = User(
+        username="hashadmin",
+        email="hashadmin@example.com",
+        hashed_password=Hash().get_password_hash("adminpass"),
+        is_verified=True,
+        is_admin=True,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+    await client.post("/api/auth/login", data={"username": "hashadmin", "password": "adminpass"})
+    headers = {"Authorization": f"Bearer {await create_access_token({'sub': admin.username})}"}
+
+    response = await client.get("/api/admin/password-hashing", headers=headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert {"max_workers", "max_queue", "in_flight", "queue_depth", "rejected"} <= stats.keys()
+    assert stats["completed"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_db_statement_stats_for_admin(client: AsyncClient, db_session):
+    admin = User(
+        username="statementadmin",
+        email="statementadmin@example.com",
+        hashed_password="x",
+        is_verified=True,
+        is_admin=True,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {await create_access_token({'sub': admin.username})}"}
+
+    await client.get("/api/contacts/", headers=headers)
+    await client.get("/api/contacts/", headers=headers)
+    response = await client.get("/api/admin/db-statements", headers=headers)
+
+    assert response.status_code == 200
+    assert {"hits", "misses", "hit_rate", "size"} <= response.json()["compiled_cache"].keys()
+    assert response.json()["contact_lists"]["hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_auth_stats_for_admin(client: AsyncClient, db_session):
+    admin = User(
+        username="authstatsadmin",
+        email="authstatsadmin@example.com",
+        hashed_password="x",
+        is_verified=True,
+        is_admin=True,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {await create_access_token({'sub': admin.username})}"}
+
+    await client.get("/api/admin/auth-stats", headers=headers)
+    response = await client.get("/api/admin/auth-stats", headers=headers)
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["access_tokens"]["hits"] >= 1
+    assert {"local", "redis", "coalesced_loads"} <= stats["users"].keys()
+    assert {"local_rejections", "redis_rejections"} <= stats["rate_limit"].keys()
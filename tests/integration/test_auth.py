@@ -3,8 +3,11 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
-from src.services.auth import Hash, create_access_token, create_refresh_token, create_email_token
+from src.services.auth import Hash, create_access_token, create_email_token, verify_refresh_token
+from src.services.hashing import build_crypt_context
+from src.services.refresh_tokens import RefreshTokenService
 from main import app
+from tests.conftest import TestSessionLocal
 
 
 @pytest.mark.asyncio
@@ -76,13 +79,87 @@ async def test_refresh_token(client: AsyncClient, db_session: AsyncSession):
     db_session.add(user)
     await db_session.commit()
 
-    refresh_token = await create_refresh_token({"sub": user.username})
-    user.refresh_token = refresh_token
-    await db_session.commit()
+    refresh_token = await RefreshTokenService(db_session).issue(user, "pytest")
 
     response = await client.post("/api/auth/refresh-token", json={"refresh_token": refresh_token})
     assert response.status_code == 200
     assert "access_token" in response.json()
+    assert response.json()["refresh_token"] != refresh_token
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_all_sessions(client: AsyncClient, db_session: AsyncSession):
+    user = User(
+        username="reuseme",
+        email="reuse@example.com",
+        hashed_password=Hash().get_password_hash("pass"),
+        is_verified=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    service = RefreshTokenService(db_session)
+    laptop_token = await service.issue(user, "laptop")
+    phone_token = await service.issue(user, "phone")
+
+    rotated = await client.post("/api/auth/refresh-token", json={"refresh_token": laptop_token})
+    assert rotated.status_code == 200
+
+    reused = await client.post("/api/auth/refresh-token", json={"refresh_token": laptop_token})
+    assert reused.status_code == 401
+
+    for token in (phone_token, rotated.json()["refresh_token"]):
+        response = await client.post("/api/auth/refresh-token", json={"refresh_token": token})
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refresh_with_same_token_is_reuse(db_session: AsyncSession):
+    user = User(
+        username="raceme",
+        email="race@example.com",
+        hashed_password=Hash().get_password_hash("pass"),
+        is_verified=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+    refresh_token = await RefreshTokenService(db_session).issue(user, "laptop")
+
+    async with TestSessionLocal() as first, TestSessionLocal() as second:
+        first_session = await verify_refresh_token(refresh_token, first)
+        second_session = await verify_refresh_token(refresh_token, second)
+        assert first_session is not None and second_session is not None
+
+        rotated = await RefreshTokenService(first).rotate(first_session)
+        assert rotated is not None
+        assert await RefreshTokenService(second).rotate(second_session) is None
+
+    async with TestSessionLocal() as session:
+        assert await verify_refresh_token(rotated, session) is None
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_only_current_device(client: AsyncClient, db_session: AsyncSession):
+    user = User(
+        username="logoutme",
+        email="logout@example.com",
+        hashed_password=Hash().get_password_hash("pass"),
+        is_verified=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    service = RefreshTokenService(db_session)
+    laptop_token = await service.issue(user, "laptop")
+    phone_token = await service.issue(user, "phone")
+
+    response = await client.post("/api/auth/logout", json={"refresh_token": laptop_token})
+    assert response.status_code == 204
+
+    response = await client.post("/api/auth/refresh-token", json={"refresh_token": laptop_token})
+    assert response.status_code == 401
+    response = await client.post("/api/auth/refresh-token", json={"refresh_token": phone_token})
+    assert response.status_code == 200
 
 
 @pytest.mark.asyncio
@@ -101,3 +178,47 @@ async def test_confirm_email(client: AsyncClient, db_session: AsyncSession):
     assert response.status_code == 200
     assert response.json()[
         "message"] == "Your email has been successfully verified."
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password_hash(client: AsyncClient, db_session: AsyncSession):
+    password = "password123"
+    outdated_hash = build_crypt_context("bcrypt", bcrypt_rounds=4).hash(password)
+    user = User(
+        username="rehashme",
+        email="rehashme@example.com",
+        hashed_password=outdated_hash,
+        is_verified=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    response = await client.post("/api/auth/login", data={"username": "rehashme", "password": password})
+    assert response.status_code == 200
+
+    await db_session.refresh(user)
+    assert user.hashed_password != outdated_hash
+    assert not Hash().pwd_context.needs_update(user.hashed_password)
+    assert Hash().verify_password(password, user.hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_hash_at_previous_default_cost(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    password = "password123"
+    previous_hash = build_crypt_context("bcrypt", bcrypt_rounds=5).hash(password)
+    monkeypatch.setattr(Hash, "pwd_context", build_crypt_context("bcrypt", bcrypt_rounds=6))
+    user = User(
+        username="upgrademe",
+        email="upgrademe@example.com",
+        hashed_password=previous_hash,
+        is_verified=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    response = await client.post("/api/auth/login", data={"username": "upgrademe", "password": password})
+    assert response.status_code == 200
+
+    await db_session.refresh(user)
+    assert user.hashed_password.startswith("$2b$06$")
+    assert Hash().verify_password(password, user.hashed_password)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+import uuid
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+from src.database.models import Contact, User
+from src.services.auth import create_access_token
+
+
+@pytest.fixture
+async def exporter(db_session):
+    suffix = uuid.uuid4().hex[:8]
+    owner = User(username=f"exporter-{suffix}", email=f"exporter-{suffix}@example.com", hashed_password="x",
+                 is_verified=True, is_admin=False)
+    db_session.add(owner)
+    await db_session.commit()
+    db_session.add_all([
+        Contact(name=f"Name{i}", last_name="Export", email=f"e{i}@example.com", phone="1234567890",
+                birthday=date(1990, 1, i + 1), additional_info="semi; colon, comma\nline" if i == 0 else None,
+                user_id=owner.id)
+        for i in range(5)
+    ])
+    await db_session.commit()
+    token = await create_access_token({"sub": owner.username})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_in_batches(client: AsyncClient, exporter, monkeypatch):
+    monkeypatch.setattr("src.services.contact_export.config.CONTACT_EXPORT_BATCH_SIZE", 2)
+
+    response = await client.get("/api/contacts/export", headers={**exporter, "Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    contacts = [json.loads(line) for line in response.text.splitlines()]
+    assert [contact["email"] for contact in contacts] == [f"e{i}@example.com" for i in range(5)]
+    assert contacts[0]["birthday"] == "1990-01-01"
+
+
+@pytest.mark.asyncio
+async def test_export_csv_gzip(client: AsyncClient, exporter):
+    response = await client.get("/api/contacts/export", params={"format": "csv"},
+                                headers={**exporter, "Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[0]["additional_info"] == "semi; colon, comma\nline"
+
+
+@pytest.mark.asyncio
+async def test_export_vcard(client: AsyncClient, exporter):
+    response = await client.get("/api/contacts/export", params={"format": "vcf"}, headers=exporter)
+
+    assert response.headers["content-type"] == "text/vcard; charset=utf-8"
+    assert response.text.count("BEGIN:VCARD\r\n") == 5
+    assert "N:Export;Name0;;;\r\n" in response.text
+    assert "NOTE:semi\\; colon\\, comma\\nline\r\n" in response.text
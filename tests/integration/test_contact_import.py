@@ -0,0 +1,87 @@
+import json
+import uuid
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+from src.database.models import Contact, User
+from src.services.auth import create_access_token
+
+
+@pytest.fixture
+async def importer(db_session):
+    suffix = uuid.uuid4().hex[:8]
+    owner = User(username=f"importer-{suffix}", email=f"importer-{suffix}@example.com", hashed_password="x",
+                 is_verified=True, is_admin=False)
+    db_session.add(owner)
+    await db_session.commit()
+    db_session.add(Contact(name="Old", last_name="Name", email="kept@example.com", phone="1234567890",
+                           birthday=date(1990, 1, 1), user_id=owner.id))
+    await db_session.commit()
+    token = await create_access_token({"sub": owner.username})
+    return {"Authorization": f"Bearer {token}"}
+
+
+CSV = (
+    "name,last_name,email,phone,birthday,additional_info\n"
+    "Alice,Smith,alice@example.com,1234567890,1990-05-01,\n"
+    'Bob,Jones,bob@example.com,1234567890,1985-12-24,"likes\n""quotes"""\n'
+    "Bad,Row,not-an-email,1234567890,1990-01-01,\n"
+    "Kept,Renamed,kept@example.com,1234567890,1990-01-01,\n"
+)
+
+
+@pytest.mark.asyncio
+async def test_import_csv_upserts_and_reports_rejected_rows(client: AsyncClient, importer, mock_redis):
+    response = await client.post("/api/contacts/import", content=CSV.encode(),
+                                 headers={**importer, "Content-Type": "text/csv"})
+
+    report = response.json()
+    assert response.status_code == 200
+    assert (report["status"], report["processed"], report["imported"], report["failed"]) == ("completed", 4, 3, 1)
+    assert report["errors"][0]["row"] == 3
+    assert report["errors"][0]["errors"][0].startswith("email")
+
+    contacts = (await client.get("/api/contacts/?limit=10&sort=last_name", headers=importer)).json()
+    assert [contact["last_name"] for contact in contacts] == ["Jones", "Renamed", "Smith"]
+    assert contacts[0]["additional_info"] == 'likes\n"quotes"'
+    mock_redis.pipeline.return_value.hset.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_in_batches(client: AsyncClient, importer, monkeypatch):
+    monkeypatch.setattr("src.services.contact_import.config.CONTACT_IMPORT_BATCH_SIZE", 2)
+    lines = [json.dumps({"name": f"Person{i}", "last_name": "Batch", "email": f"p{i}@example.com",
+                         "phone": "1234567890", "birthday": "1990-01-01"}) for i in range(5)]
+    body = "\n".join(lines[:2] + ["{broken"] + lines[2:]) + "\n"
+
+    response = await client.post("/api/contacts/import", params={"format": "ndjson"}, content=body.encode(),
+                                 headers=importer)
+
+    report = response.json()
+    assert (report["processed"], report["imported"], report["failed"]) == (6, 5, 1)
+    assert report["errors"][0]["row"] == 3
+
+
+@pytest.mark.asyncio
+async def test_import_requires_known_format(client: AsyncClient, importer):
+    response = await client.post("/api/contacts/import", content=b"x", headers={**importer, "Content-Type": "text/plain"})
+
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_import_progress(client: AsyncClient, importer, mock_redis):
+    mock_redis.hgetall.return_value = {b"status": b"running", b"processed": b"2000", b"imported": b"1990",
+                                       b"failed": b"10"}
+    mock_redis.lrange.return_value = [b'{"row": 7, "errors": ["email: invalid"]}']
+
+    response = await client.get("/api/contacts/import/job-1", headers=importer)
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1990
+    assert response.json()["errors"] == [{"row": 7, "errors": ["email: invalid"]}]
+
+    mock_redis.hgetall.return_value = {}
+    response = await client.get("/api/contacts/import/unknown", headers=importer)
+    assert response.status_code == 404
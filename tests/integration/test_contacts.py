@@ -0,0 +1,303 @@
+import uuid
+import pytest
+from datetime import date
+from httpx import AsyncClient
+
+from src.conf.config import config
+from src.database.models import Contact, User
+from src.repository.contacts import ContactRepository
+from src.repository.pagination import encode_cursor
+from src.schemas import CachedUser, ContactCreate, ContactUpdate
+from src.services.auth import access_token_claims, create_access_token
+from src.services.cache import user_cache
+
+
+@pytest.fixture
+def claims_only(monkeypatch):
+    monkeypatch.setattr(config, "AUTH_CLAIMS_ONLY", True)
+    yield
+    user_cache.token_versions.clear()
+
+
+@pytest.mark.asyncio
+async def test_claims_only_token_skips_user_lookup(client: AsyncClient, claims_only, mock_redis):
+    ghost = CachedUser(id=999_999, username="ghost", email="ghost@example.com", is_admin=False, is_verified=True)
+    token = await create_access_token(access_token_claims(ghost))
+
+    response = await client.get("/api/contacts/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert not any(call.args[0].startswith("user:") for call in mock_redis.get.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_claims_only_token_rejected_after_revocation(client: AsyncClient, claims_only):
+    ghost = CachedUser(id=999_999, username="ghost", email="ghost@example.com", is_admin=False, is_verified=True)
+    token = await create_access_token(access_token_claims(ghost))
+    await user_cache.revoke_tokens("ghost", 1)
+
+    response = await client.get("/api/contacts/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
+
+
+@pytest.fixture
+async def birthday_owner(db_session):
+    suffix = uuid.uuid4().hex[:8]
+    owner = User(username=f"birthdays-{suffix}", email=f"birthdays-{suffix}@example.com", hashed_password="x",
+                 is_verified=True, is_admin=False)
+    db_session.add(owner)
+    await db_session.commit()
+    for name, birthday in [
+        ("Newyear", date(1990, 1, 2)),
+        ("Leapday", date(1992, 2, 29)),
+        ("March", date(1985, 3, 1)),
+        ("Summer", date(1980, 7, 15)),
+        ("Yearend", date(1975, 12, 31)),
+    ]:
+        db_session.add(Contact(name=name, last_name="Doe", email=f"{name.lower()}@example.com",
+                               phone="1234567890", birthday=birthday, user_id=owner.id))
+    await db_session.commit()
+    return owner
+
+
+async def upcoming(db_session, owner, days, today, limit=50):
+    contacts = await ContactRepository(db_session).get_birthdays(days, owner, limit, today=today)
+    return [contact.name for contact in contacts]
+
+
+@pytest.mark.asyncio
+async def test_birthdays_window_wraps_past_new_year(db_session, birthday_owner):
+    assert await upcoming(db_session, birthday_owner, 5, date(2025, 12, 30)) == ["Yearend", "Newyear"]
+
+
+@pytest.mark.asyncio
+async def test_birthdays_on_leap_day_are_celebrated_on_march_first(db_session, birthday_owner):
+    assert await upcoming(db_session, birthday_owner, 0, date(2025, 3, 1)) == ["Leapday", "March"]
+    assert await upcoming(db_session, birthday_owner, 0, date(2025, 2, 28)) == []
+    assert await upcoming(db_session, birthday_owner, 1, date(2024, 2, 28)) == ["Leapday"]
+
+
+@pytest.mark.asyncio
+async def test_birthdays_are_ordered_and_limited(db_session, birthday_owner):
+    assert await upcoming(db_session, birthday_owner, 365, date(2025, 7, 1), limit=3) == [
+        "Summer", "Yearend", "Newyear"]
+
+
+@pytest.mark.asyncio
+async def test_birthdays_window_longer_than_a_year_covers_the_whole_year(client: AsyncClient, db_session, birthday_owner):
+    assert await upcoming(db_session, birthday_owner, 100_000_000, date(2025, 7, 1)) == [
+        "Summer", "Yearend", "Newyear", "Leapday", "March"]
+
+    token = await create_access_token({"sub": birthday_owner.username})
+    response = await client.get("/api/contacts/birthdays", params={"days": 100_000_000},
+                                headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+
+
+@pytest.fixture
+async def search_owner(db_session):
+    suffix = uuid.uuid4().hex[:8]
+    owner = User(username=f"search-{suffix}", email=f"search-{suffix}@example.com", hashed_password="x",
+                 is_verified=True, is_admin=False)
+    db_session.add(owner)
+    await db_session.commit()
+    for name, last_name, email in [
+        ("Johnny", "Walker", "walker@example.com"),
+        ("Maria", "Johnson", "maria@example.com"),
+        ("Peter", "Parker", "peter@johnston.org"),
+        ("Ann", "Smith", "ann@example.com"),
+    ]:
+        db_session.add(Contact(name=name, last_name=last_name, email=email, phone="1234567890",
+                               birthday=date(1990, 1, 1), user_id=owner.id))
+    await db_session.commit()
+    return owner
+
+
+@pytest.mark.asyncio
+async def test_search_matches_substrings_across_fields(db_session, search_owner):
+    contacts, next_cursor = await ContactRepository(db_session).search_contacts("john", search_owner)
+
+    assert {contact.name for contact in contacts} == {"Johnny", "Maria", "Peter"}
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_search_pages_with_cursor(db_session, search_owner):
+    repository = ContactRepository(db_session)
+
+    first, cursor = await repository.search_contacts("john", search_owner, limit=2)
+    second, last_cursor = await repository.search_contacts("john", search_owner, limit=2, after=cursor)
+
+    assert len(first) == 2 and len(second) == 1
+    assert {contact.id for contact in first}.isdisjoint(contact.id for contact in second)
+    assert last_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_sets_next_link_and_rejects_bad_cursor(client: AsyncClient, search_owner):
+    token = await create_access_token({"sub": search_owner.username})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/api/contacts/search", params={"query": "john", "limit": 1}, headers=headers)
+    assert response.status_code == 200
+    assert 'rel="next"' in response.headers["Link"]
+
+    response = await client.get("/api/contacts/search", params={"query": "john", "after": "!!"}, headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_follows_next_links_to_the_end(client: AsyncClient, search_owner):
+    token = await create_access_token({"sub": search_owner.username})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    seen = []
+    url = "/api/contacts/?limit=3"
+    while url:
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200
+        seen.extend(contact["id"] for contact in response.json())
+        link = response.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+
+    assert len(seen) == 4
+    assert seen == sorted(seen)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_rejects_skip_with_cursor(client: AsyncClient, test_user_token):
+    response = await client.get("/api/contacts/", params={"skip": 2, "after": "WyJpZCIsMV0"},
+                                headers={"Authorization": f"Bearer {test_user_token}"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, cursor", [
+    ("/api/contacts/", encode_cursor("id", "x")),
+    ("/api/contacts/", encode_cursor("id", True)),
+    ("/api/contacts/?sort=last_name", encode_cursor("last_name", "Smith", 1, 2)),
+    ("/api/contacts/search?query=john", encode_cursor("high", 1)),
+    ("/api/contacts/search?query=john", encode_cursor(0.5, 1.5)),
+])
+async def test_tampered_cursor_is_rejected(client: AsyncClient, search_owner, path, cursor):
+    token = await create_access_token({"sub": search_owner.username})
+
+    response = await client.get(path, params={"after": cursor}, headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 400
+
+
+async def collect_pages(client, url, headers):
+    names = []
+    while url:
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200
+        names.extend(contact["last_name"] for contact in response.json())
+        link = response.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+    return names
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort, expected", [
+    ("last_name", ["Johnson", "Parker", "Smith", "Walker"]),
+    ("-last_name", ["Walker", "Smith", "Parker", "Johnson"]),
+    ("-created_at", ["Smith", "Parker", "Johnson", "Walker"]),
+])
+async def test_get_contacts_sorted_pages(client: AsyncClient, search_owner, sort, expected):
+    token = await create_access_token({"sub": search_owner.username})
+
+    names = await collect_pages(client, f"/api/contacts/?limit=1&sort={sort}", {"Authorization": f"Bearer {token}"})
+
+    assert names == expected
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_filters_by_email_domain(client: AsyncClient, search_owner):
+    token = await create_access_token({"sub": search_owner.username})
+
+    for domain in ("johnston.org", "Johnston.ORG"):
+        response = await client.get("/api/contacts/", params={"email_domain": domain},
+                                    headers={"Authorization": f"Bearer {token}"})
+
+        assert [contact["last_name"] for contact in response.json()] == ["Parker"]
+
+
+@pytest.mark.asyncio
+async def test_contact_reads_return_requested_fields(client: AsyncClient, search_owner, statements):
+    token = await create_access_token({"sub": search_owner.username})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    listed = await client.get("/api/contacts/", params={"fields": "email,last_name", "sort": "last_name", "limit": 2},
+                              headers=headers)
+    found = await client.get("/api/contacts/search", params={"query": "john", "fields": "name"}, headers=headers)
+
+    assert listed.json() == [{"last_name": "Johnson", "email": "maria@example.com"},
+                             {"last_name": "Parker", "email": "peter@johnston.org"}]
+    assert 'rel="next"' in listed.headers["Link"]
+    assert {contact["name"] for contact in found.json()} == {"Johnny", "Maria", "Peter"}
+    assert not [statement for statement in statements if "contacts.phone" in statement]
+
+    response = await client.get("/api/contacts/", params={"fields": "id,hashed_password"}, headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"sort": "phone"}, {"name": "Ann"}, {"email_domain": "x.com", "last_name": "Doe"}])
+async def test_get_contacts_rejects_unindexed_queries(client: AsyncClient, test_user_token, params):
+    response = await client.get("/api/contacts/", params=params,
+                                headers={"Authorization": f"Bearer {test_user_token}"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_contact_writes_take_one_statement_each(db_session, search_owner, statements):
+    repository = ContactRepository(db_session)
+    data = ContactCreate(name="Single", last_name="Trip", email="single@Trip.io",
+                         phone="1234567890", birthday=date(1991, 2, 3))
+
+    created = await repository.create_contact(data, search_owner)
+    assert len(statements) == 1 and statements[0].startswith("INSERT")
+    assert (created.email_domain, created.birthday_ordinal) == ("trip.io", 203)
+    assert created.created_at is not None
+
+    statements.clear()
+    updated = await repository.update_contact(created.id, ContactUpdate(email="single@other.io"), search_owner)
+    assert len(statements) == 1 and statements[0].startswith("UPDATE")
+    assert (updated.email, updated.email_domain) == ("single@other.io", "other.io")
+
+    statements.clear()
+    deleted = await repository.delete_contact(created.id, search_owner)
+    assert len(statements) == 1 and statements[0].startswith("DELETE")
+    assert deleted.id == created.id
+    assert await repository.delete_contact(created.id, search_owner) is None
+
+
+@pytest.mark.asyncio
+async def test_contact_reads_revalidate_with_etag(client: AsyncClient, test_user_token, redis_store, statements):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    first = await client.get("/api/contacts/", headers=headers)
+    etag = first.headers["etag"]
+
+    statements.clear()
+    cached = await client.get("/api/contacts/", headers=headers)
+    revalidated = await client.get("/api/contacts/", headers={**headers, "If-None-Match": etag})
+
+    assert cached.content == first.content
+    assert revalidated.status_code == 304
+    assert not [statement for statement in statements if "contacts" in statement]
+
+    created = await client.post("/api/contacts/", json={
+        "name": "Etag", "last_name": "Tester", "email": "etag@example.com", "phone": "1234567890",
+        "birthday": "1990-01-01"}, headers=headers)
+    changed = await client.get("/api/contacts/", headers={**headers, "If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert created.json()["id"] in [contact["id"] for contact in changed.json()]
@@ -1,11 +1,13 @@
 import pytest
 from httpx import AsyncClient
 from sqlalchemy import text
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.services.auth import create_access_token
 from src.services.auth import Hash
 from src.database.models import User
+from src.repository.users import UserRepository
+from src.schemas import UserCreate
 
 
 @pytest.mark.asyncio
@@ -32,6 +34,16 @@ async def test_get_current_user(client: AsyncClient, db_session):
     assert response.json()["email"] == user.email
 
 
+@pytest.mark.asyncio
+async def test_me_returns_429_with_retry_after(client, test_user_token, mock_redis):
+    mock_redis.register_script = MagicMock(return_value=AsyncMock(return_value=[0, 30000]))
+
+    response = await client.get("/api/users/me", headers={"Authorization": f"Bearer {test_user_token}"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+
 @pytest.mark.asyncio
 async def test_update_avatar_admin_success(client: AsyncClient, db_session):
     await db_session.execute(text("DELETE FROM users"))
@@ -183,3 +195,23 @@ async def test_update_password_mismatch(client: AsyncClient, db_session):
 
     assert response.status_code == 400
     assert response.json()["detail"] == "New passwords do not match."
+
+
+@pytest.mark.asyncio
+async def test_user_writes_take_one_statement_each(db_session, statements):
+    repository = UserRepository(db_session)
+
+    user = await repository.create_user(
+        UserCreate(username="onetrip", email="onetrip@example.com", password="hashed"), avatar="a.png")
+    assert len(statements) == 1 and statements[0].startswith("INSERT")
+    assert user.id is not None and user.is_verified is False and user.created_at is not None
+
+    statements.clear()
+    user = await repository.verifyed_email("onetrip@example.com")
+    assert len(statements) == 1 and statements[0].startswith("UPDATE")
+    assert user.is_verified is True
+
+    statements.clear()
+    user = await repository.update_avatar_url("onetrip@example.com", "b.png")
+    assert len(statements) == 1 and statements[0].startswith("UPDATE")
+    assert user.avatar == "b.png"
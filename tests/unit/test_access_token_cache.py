@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import patch
+from jose import JWTError, jwt
+
+from src.services.auth import create_access_token, create_refresh_token, decode_access_token
+from src.services.cache import access_token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    access_token_cache.clear()
+    yield
+    access_token_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_decode_access_token_verifies_signature_once():
+    token = await create_access_token({"sub": "cached"})
+    hits = access_token_cache.hits
+
+    with patch("src.services.auth.jwt.decode", wraps=jwt.decode) as decode:
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+
+    assert first["sub"] == second["sub"] == "cached"
+    decode.assert_called_once()
+    assert access_token_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_decode_access_token_rejects_and_does_not_cache_refresh_tokens():
+    token = await create_refresh_token({"sub": "cached"})
+
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+
+    assert len(access_token_cache) == 0
+
+
+def test_decode_access_token_rejects_tampered_token():
+    with pytest.raises(JWTError):
+        decode_access_token("not.a.token")
+
+    assert len(access_token_cache) == 0
@@ -3,8 +3,8 @@ from unittest.mock import AsyncMock, MagicMock
 from datetime import datetime, timedelta
 
 from src.database.models import Contact, User
-from src.schemas import ContactModel, ContactUpdate
-from src.repository.contacts import ContactRepository
+from src.schemas import ContactFilters, ContactModel, ContactUpdate
+from src.repository.contacts import ContactRepository, UnsupportedQuery
 
 
 @pytest.fixture
@@ -41,18 +41,46 @@ def contact():
 async def test_get_contacts(user, contact):
     mock_session = AsyncMock()
 
-    mock_scalars = MagicMock()
-    mock_scalars.all.return_value = [contact]
-
     mock_result = MagicMock()
-    mock_result.scalars.return_value = mock_scalars
+    mock_result.all.return_value = [contact]
 
     mock_session.execute.return_value = mock_result
 
     repo = ContactRepository(mock_session)
-    result = await repo.get_contacts(user)
+    result, next_cursor = await repo.get_contacts(user)
 
     assert result == [contact]
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_selects_requested_fields(user):
+    mock_session = AsyncMock()
+    mock_session.execute.return_value.all = MagicMock(return_value=[])
+
+    repo = ContactRepository(mock_session)
+    await repo.get_contacts(user, sort="last_name", fields=["email"])
+
+    stmt = mock_session.execute.call_args.args[0]
+    assert [column.key for column in stmt.selected_columns] == ["name", "last_name", "email", "id"]
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_rejects_unknown_fields(user):
+    repo = ContactRepository(AsyncMock())
+
+    with pytest.raises(UnsupportedQuery):
+        await repo.get_contacts(user, fields=["hashed_password"])
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_rejects_filters_without_index(user):
+    repo = ContactRepository(AsyncMock())
+
+    with pytest.raises(UnsupportedQuery) as exc:
+        await repo.get_contacts(user, filters=ContactFilters(name="Ann"))
+
+    assert str(exc.value) == "Cannot filter by name; filter by one of last_name, last_name with name, email_domain"
 
 
 @pytest.mark.asyncio
@@ -74,71 +102,73 @@ async def test_get_contact_by_id(user, contact):
 
 
 @pytest.mark.asyncio
-async def test_create_contact(user, contact_model):
+async def test_create_contact(user, contact_model, contact):
     mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = contact
+    mock_session.execute.return_value = mock_result
 
     repo = ContactRepository(mock_session)
     result = await repo.create_contact(contact_model, user)
 
-    assert isinstance(result, Contact)
-    assert result.name == contact_model.name
-    assert result.user_id == user.id
-    mock_session.add.assert_called_once()
+    assert result == contact
+    mock_session.execute.assert_called_once()
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once()
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_update_contact(user, contact):
     mock_session = AsyncMock()
-
-    mock_scalars = MagicMock()
-    mock_scalars.first.return_value = contact
-
     mock_result = MagicMock()
-    mock_result.scalars.return_value = mock_scalars
-
+    mock_result.scalar_one_or_none.return_value = contact
     mock_session.execute.return_value = mock_result
 
     update_data = ContactUpdate(phone="0987654321")
     repo = ContactRepository(mock_session)
     result = await repo.update_contact(1, update_data, user)
 
-    assert result.phone == "0987654321"
+    assert result is contact
+    mock_session.execute.assert_called_once()
+    params = mock_session.execute.call_args.args[0].compile().params
+    assert params["phone"] == "0987654321"
+    assert params["id_1"] == 1 and params["user_id_1"] == user.id
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once()
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_delete_contact(user, contact):
     mock_session = AsyncMock()
-    repo = ContactRepository(mock_session)
-    repo.get_contact_by_id = AsyncMock(return_value=contact)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = contact
+    mock_session.execute.return_value = mock_result
 
+    repo = ContactRepository(mock_session)
     result = await repo.delete_contact(1, user)
 
     assert result == contact
-    mock_session.delete.assert_called_once_with(contact)
+    mock_session.execute.assert_called_once()
+    mock_session.delete.assert_not_called()
     mock_session.commit.assert_called_once()
 
 
 @pytest.mark.asyncio
 async def test_search_contacts(user, contact):
     mock_session = AsyncMock()
-
-    mock_scalars = MagicMock()
-    mock_scalars.all.return_value = [contact]
+    mock_session.bind.dialect.name = "sqlite"
 
     mock_result = MagicMock()
-    mock_result.scalars.return_value = mock_scalars
+    mock_result.all.return_value = [contact]
 
     mock_session.execute.return_value = mock_result
 
     repo = ContactRepository(mock_session)
-    result = await repo.search_contacts("john", user)
+    result, next_cursor = await repo.search_contacts("john", user)
 
     assert len(result) == 1
     assert result[0].email == contact.email
+    assert next_cursor is None
 
 
 @pytest.mark.asyncio
@@ -146,11 +176,8 @@ async def test_get_birthdays(user, contact):
     contact.birthday = (datetime.today() + timedelta(days=3)).date()
     mock_session = AsyncMock()
 
-    mock_scalars = MagicMock()
-    mock_scalars.all.return_value = [contact]
-
     mock_result = MagicMock()
-    mock_result.scalars.return_value = mock_scalars
+    mock_result.all.return_value = [contact]
 
     mock_session.execute.return_value = mock_result
 
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+
+from src.conf.config import config
+from src.services import auth
+from src.services.auth import Hash
+from src.services.hashing import PasswordHashPool, build_crypt_context, calibrate_crypt_context
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_from_worker_thread():
+    pool = PasswordHashPool(max_workers=1, max_queue=0)
+
+    result = await pool.run(lambda a, b: (threading.current_thread().name, a + b), 2, 3)
+
+    assert result[0].startswith("password-hash")
+    assert result[1] == 5
+    assert pool.stats()["completed"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_saturated():
+    pool = PasswordHashPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    busy = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert pool.queue_depth == 1
+
+    with pytest.raises(HTTPException) as exc:
+        await pool.run(release.wait)
+
+    assert exc.value.status_code == 503
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*busy)
+    assert pool.in_flight == 0
+    pool.shutdown()
+
+
+def test_calibrate_never_goes_below_minimum_rounds():
+    context = calibrate_crypt_context("bcrypt", target_ms=0.001, bcrypt_min_rounds=4)
+
+    assert context.to_dict()["bcrypt__default_rounds"] == 4
+
+
+def test_calibrate_raises_rounds_up_to_target():
+    context = calibrate_crypt_context("bcrypt", target_ms=10_000, bcrypt_min_rounds=4, bcrypt_max_rounds=6)
+
+    assert context.to_dict()["bcrypt__default_rounds"] == 6
+
+
+def test_crypt_context_keeps_stronger_bcrypt_hashes():
+    context = build_crypt_context("bcrypt", bcrypt_rounds=5)
+
+    assert not context.needs_update(build_crypt_context("bcrypt", bcrypt_rounds=6).hash("secret"))
+    assert context.needs_update(build_crypt_context("bcrypt", bcrypt_rounds=4).hash("secret"))
+
+
+@pytest.mark.asyncio
+async def test_calibrate_shares_result_through_redis(redis_store, monkeypatch):
+    monkeypatch.setattr(Hash, "pwd_context", Hash.pwd_context)
+    monkeypatch.setattr(config, "BCRYPT_MIN_ROUNDS", 4)
+    monkeypatch.setattr(config, "BCRYPT_MAX_ROUNDS", 5)
+
+    first = await Hash.calibrate()
+    assert len(redis_store) == 1
+
+    monkeypatch.setattr(auth, "calibrate_crypt_context", lambda *args: pytest.fail("calibrated twice"))
+    second = await Hash.calibrate()
+
+    assert second.to_dict() == first.to_dict()
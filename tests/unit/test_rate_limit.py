@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from redis.exceptions import ConnectionError
+
+from src.database.redis import redis_manager
+from src.services.auth import create_access_token
+from src.services.rate_limit import RateLimiter, RateLimitExceeded, parse_rate, rate_limit_key
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter(redis_manager, {"default": "3/minute", "strict": "1/second"})
+
+
+def make_request(headers=None, host="10.0.0.1"):
+    request = MagicMock()
+    request.headers = headers or {}
+    request.client.host = host
+    return request
+
+
+def test_parse_rate():
+    assert parse_rate("5/minute") == (5, 60)
+    assert parse_rate("100/hours") == (100, 3600)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_key_prefers_authenticated_user():
+    token = await create_access_token({"sub": "limited"})
+
+    assert rate_limit_key(make_request({"authorization": f"Bearer {token}"})) == "user:limited"
+    assert rate_limit_key(make_request({"authorization": "Bearer broken"})) == "ip:10.0.0.1"
+    assert rate_limit_key(make_request()) == "ip:10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_hit_rejects_when_redis_window_is_full(limiter, mock_redis):
+    script = AsyncMock(return_value=[0, 1500])
+    mock_redis.register_script = MagicMock(return_value=script)
+
+    with pytest.raises(RateLimitExceeded) as exc:
+        await limiter.hit("default", "user:a")
+
+    assert exc.value.retry_after == 1.5
+    assert script.call_args.kwargs["keys"] == ["rate-limit:default:user:a"]
+    assert limiter.stats()["redis_rejections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_bucket_rejects_without_redis(limiter, mock_redis):
+    await limiter.hit("strict", "user:a")
+    script = mock_redis.register_script.return_value
+    script.reset_mock()
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.hit("strict", "user:a")
+
+    script.assert_not_called()
+    assert limiter.stats()["local_rejections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hit_falls_back_to_local_buckets_when_redis_is_down(limiter, mock_redis):
+    mock_redis.register_script = MagicMock(return_value=AsyncMock(side_effect=ConnectionError("down")))
+
+    await limiter.hit("default", "user:a")
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import column, insert, table, text
+
+from src.database.db import DatabaseSessionManager
+from src.database.redis import redis_manager
+
+
+@pytest.fixture
+async def manager(tmp_path):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        replica_urls=[
+            f"sqlite+aiosqlite:///{tmp_path / 'replica1.db'}",
+            f"sqlite+aiosqlite:///{tmp_path / 'replica2.db'}",
+        ],
+        pin_seconds=5,
+    )
+    yield manager
+    await manager.close()
+
+
+async def database_file(session) -> str:
+    rows = (await session.execute(text("PRAGMA database_list"))).all()
+    return rows[0].file.rsplit("/", 1)[-1]
+
+
+@pytest.mark.asyncio
+async def test_reads_are_spread_across_replicas(manager):
+    seen = set()
+    for _ in range(4):
+        async with manager.replica_session(user_id=1) as session:
+            seen.add(await database_file(session))
+
+    assert seen == {"replica1.db", "replica2.db"}
+
+
+@pytest.mark.asyncio
+async def test_writer_is_pinned_to_primary(manager):
+    async with manager.session() as session:
+        session.info["user_id"] = 1
+        await session.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY)"))
+        await session.execute(insert(table("notes", column("id"))).values(id=1))
+        await session.commit()
+
+    async with manager.session() as session:
+        session.info["user_id"] = 1
+        await session.connection()
+        await session.commit()
+
+    assert await manager.is_pinned(1)
+    async with manager.replica_session(user_id=1) as session:
+        assert session is None
+    async with manager.replica_session(user_id=2) as session:
+        assert session is not None
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(tmp_path):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+    )
+
+    async with manager.replica_session(user_id=1) as session:
+        assert session is None
+    assert manager.pool_stats()["replicas"][0]["healthy"] is False
+
+    (tmp_path / "missing").mkdir()
+    await manager.check_replicas()
+    assert manager.pool_stats()["replicas"][0]["healthy"] is True
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_pin_is_shared_through_redis(tmp_path, mock_redis):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+        replica_urls=[f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"],
+        redis=redis_manager,
+        pin_seconds=5,
+    )
+    mock_redis.exists.return_value = 1
+
+    assert await manager.is_pinned(42)
+    mock_redis.exists.assert_awaited_once_with("db-pin:42")
+    await manager.close()
@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import AsyncMock
+from redis.exceptions import ConnectionError
+from starlette.requests import Request
+
+from src.database.redis import redis_manager
+from src.services.response_cache import ResponseCache
+
+
+def make_request(path="/api/contacts/", query="limit=10", etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(),
+                    "headers": headers, "server": ("test", 80), "scheme": "http"})
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(redis_manager, prefix="test-cache", ttl=60, max_body_bytes=1024)
+
+
+@pytest.mark.asyncio
+async def test_versions_start_once_and_move_on_bump(cache, redis_store):
+    first = await cache.version(1)
+
+    assert await cache.version(1) == first
+    await cache.bump(1)
+    assert await cache.version(1) == first + 1
+    assert await cache.version(2) != first + 1
+
+
+@pytest.mark.asyncio
+async def test_respond_caches_body_and_answers_etag_with_304(cache, redis_store):
+    render = AsyncMock(return_value=(b"[1,2,3]", {"Link": '<http://test/next>; rel="next"'}))
+
+    miss = await cache.respond(make_request(), 1, render)
+    hit = await cache.respond(make_request(), 1, render)
+    revalidated = await cache.respond(make_request(etag=miss.headers["etag"]), 1, render)
+
+    render.assert_awaited_once()
+    assert hit.body == miss.body == b"[1,2,3]"
+    assert hit.headers["link"] == '<http://test/next>; rel="next"'
+    assert hit.headers["etag"] == miss.headers["etag"]
+    assert revalidated.status_code == 304
+    assert cache.stats() | {"hit_rate": None} == {
+        "hits": 1, "misses": 1, "not_modified": 1, "bypassed": 0, "hit_rate": None,
+        "bytes_from_cache": 7, "bytes_not_sent": 7,
+    }
+
+
+@pytest.mark.asyncio
+async def test_bump_invalidates_cached_responses(cache, redis_store):
+    render = AsyncMock(side_effect=[(b"[1]", {}), (b"[1,2]", {})])
+    before = await cache.respond(make_request(), 1, render)
+
+    await cache.bump(1)
+    after = await cache.respond(make_request(etag=before.headers["etag"]), 1, render)
+
+    assert after.status_code == 200
+    assert after.body == b"[1,2]"
+    assert after.headers["etag"] != before.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_vary_separates_entries(cache, redis_store):
+    render = AsyncMock(side_effect=[(b"[1]", {}), (b"[2]", {})])
+
+    monday = await cache.respond(make_request(), 1, render, vary="2026-10-19")
+    tuesday = await cache.respond(make_request(etag=monday.headers["etag"]), 1, render, vary="2026-10-20")
+
+    assert tuesday.status_code == 200
+    assert tuesday.body == b"[2]"
+
+
+@pytest.mark.asyncio
+async def test_respond_renders_when_redis_is_down(cache, mock_redis):
+    mock_redis.get.side_effect = ConnectionError("down")
+    render = AsyncMock(return_value=(b"[]", {}))
+
+    response = await cache.respond(make_request(), 1, render)
+
+    assert response.body == b"[]"
+    assert "etag" not in response.headers
+    assert cache.stats()["bypassed"] == 1
@@ -0,0 +1,39 @@
+import json
+from datetime import date, datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from src.database.models import Contact
+from src.schemas import ContactResponse
+from src.services.serialization import dump_contact, dump_contact_lines, dump_contacts
+
+
+CONTACT_LIST = TypeAdapter(List[ContactResponse])
+
+
+def make_contacts():
+    return [
+        Contact(id=1, name="Ірина", last_name="Doe", email="iryna@example.com", phone="1234567890",
+                birthday=date(1990, 2, 28), additional_info='quote " and \\ backslash',
+                created_at=datetime(2025, 6, 1, 12, 0, 0, 123456), updated_at=None),
+        Contact(id=2, name="John", last_name="Smith", email="john@example.com", phone="1234567890",
+                birthday=date(1985, 12, 24), additional_info=None,
+                created_at=datetime(2025, 6, 2, 8, 30, tzinfo=timezone.utc),
+                updated_at=datetime(2025, 6, 3, 9, 15, 1)),
+    ]
+
+
+def test_dump_contacts_matches_pydantic():
+    contacts = make_contacts()
+
+    expected = CONTACT_LIST.dump_json(CONTACT_LIST.validate_python(contacts, from_attributes=True))
+
+    assert dump_contacts(contacts) == expected
+    assert dump_contact(contacts[0]) == ContactResponse.model_validate(contacts[0]).model_dump_json().encode()
+
+
+def test_dump_contact_lines():
+    lines = dump_contact_lines(make_contacts()).splitlines()
+
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
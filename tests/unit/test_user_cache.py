@@ -0,0 +1,174 @@
+import asyncio
+import time
+import pytest
+
+from src.database.models import User
+from src.services.cache import SingleFlight, TTLCache, UserCache
+from src.database.redis import redis_manager
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def user():
+    return User(id=1, username="testuser", email="test@example.com", is_admin=False, is_verified=True,
+                token_version=0)
+
+
+@pytest.fixture
+def cache():
+    return UserCache(redis_manager, maxsize=10, local_ttl=30, redis_ttl=900, channel="test-channel")
+
+
+def test_ttl_cache_expires_entries():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    timer.now = 5
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+@pytest.mark.asyncio
+async def test_user_cache_local_hit_skips_redis(cache, user, mock_redis):
+    await cache.set(user.username, user)
+    mock_redis.get.reset_mock()
+
+    result = await cache.get(user.username)
+
+    assert result.id == user.id
+    mock_redis.get.assert_not_called()
+    mock_redis.set.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_user_cache_redis_hit_fills_local_tier(cache, user, mock_redis):
+    mock_redis.get.return_value = UserCache.encode(user, time.time() + 900)
+
+    result = await cache.get(user.username)
+
+    assert result.username == user.username
+    assert result.is_verified is True
+    assert cache.local.get(user.username) is result
+    assert cache.stats()["redis"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_ignores_unreadable_payload(cache, user, mock_redis):
+    mock_redis.get.return_value = b"\x80\x04legacy pickle"
+
+    result = await cache.get(user.username)
+
+    assert result is None
+    assert cache.stats()["redis"]["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_refreshes_entries_close_to_expiry(cache, user, mock_redis):
+    mock_redis.get.return_value = UserCache.encode(user, time.time() - 1)
+
+    result = await cache.get(user.username)
+
+    assert result is None
+    assert cache.stats()["redis"]["early_refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_set_jitters_ttl(user, mock_redis):
+    cache = UserCache(redis_manager, maxsize=10, local_ttl=30, redis_ttl=1000,
+                      channel="test-channel", ttl_jitter=0.2)
+
+    for _ in range(20):
+        await cache.set(user.username, user)
+
+    ttls = {call.kwargs["ex"] for call in mock_redis.set.call_args_list}
+    assert len(ttls) > 1
+    assert all(800 <= ttl <= 1000 for ttl in ttls)
+
+
+@pytest.mark.asyncio
+async def test_user_cache_coalesces_concurrent_misses(cache, user):
+    calls = 0
+
+    async def loader(username):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return user
+
+    results = await asyncio.gather(*(cache.get_or_load(user.username, loader) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result.id == user.id for result in results)
+    assert cache.stats()["coalesced_loads"] == 9
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_to_waiters():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_waiters_survive_cancelled_leader():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(flight.do("key", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await asyncio.gather(*waiters) == [2, 2, 2]
+    assert leader.cancelled()
+    assert calls == 2
+
+
+def test_user_cache_key_is_versioned(cache):
+    assert cache.key("testuser") == "user:v1:testuser"
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidate_publishes_eviction(cache, user, mock_redis):
+    await cache.set(user.username, user)
+
+    await cache.invalidate(user.username)
+
+    assert cache.local.get(user.username) is None
+    mock_redis.delete.assert_called_once_with(cache.key(user.username))
+    mock_redis.publish.assert_called_once_with("test-channel", user.username)
@@ -71,20 +71,21 @@ async def test_get_user_by_email(test_user):
 
 
 @pytest.mark.asyncio
-async def test_create_user(user_create):
+async def test_create_user(user_create, test_user):
     mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = test_user
+    mock_session.execute.return_value = mock_result
 
     repo = UserRepository(mock_session)
     result = await repo.create_user(user_create, avatar="https://avatar.png")
 
-    assert result.username == user_create.username
-    assert result.email == user_create.email
-    assert result.hashed_password == user_create.password
-    assert result.avatar == "https://avatar.png"
-
-    mock_session.add.assert_called_once()
+    assert result == test_user
+    statement = mock_session.execute.call_args.args[0]
+    assert statement.compile().params["avatar"] == "https://avatar.png"
+    assert statement.compile().params["hashed_password"] == user_create.password
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once()
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -99,22 +100,30 @@ async def test_verifyed_email(test_user):
     repo = UserRepository(mock_session)
     result = await repo.verifyed_email(test_user.email)
 
-    assert result.is_verified is True
+    assert result is test_user
+    mock_session.execute.assert_called_once()
+    params = mock_session.execute.call_args.args[0].compile().params
+    assert params == {"is_verified": True, "email_1": test_user.email}
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once_with(test_user)
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_update_avatar_url(test_user):
     mock_session = AsyncMock()
-    mock_repo = UserRepository(mock_session)
-    mock_repo.get_user_by_email = AsyncMock(return_value=test_user)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = test_user
+    mock_session.execute.return_value = mock_result
 
-    result = await mock_repo.update_avatar_url("test@example.com", "https://new-avatar.jpg")
+    repo = UserRepository(mock_session)
+    result = await repo.update_avatar_url("test@example.com", "https://new-avatar.jpg")
 
-    assert result.avatar == "https://new-avatar.jpg"
+    assert result is test_user
+    mock_session.execute.assert_called_once()
+    params = mock_session.execute.call_args.args[0].compile().params
+    assert params == {"avatar": "https://new-avatar.jpg", "email_1": "test@example.com"}
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once()
+    mock_session.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio